@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""Offline benchmarks for the writers' hot paths.
+
+FileBrowser calls go to a local stand-in server (login, health, resources and
+tus routes) running in a child process, so client CPU is measured on its own.
+MySQL and MongoDB inserts run against driver-level fakes that measure only
+the writer's own work. Set MYSQL_DB_HOST / MONGO_DB_HOST (and the usual
+credentials) to run the same loops against real local mysqld / mongod
+instead. Writers whose driver is not installed are reported as skipped.
+Each suite runs in its own forked process, so its peak RSS is its own.
+
+    python benchmark.py --output new.json --compare old.json
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Writers read these at import time.
+os.environ.setdefault("LOG_SAMPLE_EVERY", "1000000000")
+os.environ.setdefault("LOG_SUMMARY_SEC", "0")
+os.environ.setdefault("METRICS_PORT", "0")
+CONFIG_DIR = tempfile.mkdtemp(prefix="bench-config-")
+os.environ["CONFIG_PATH"] = CONFIG_DIR
+
+MB = 1024 * 1024
+
+
+# ─────────────────────────────────────────────
+# FileBrowser stand-in
+# ─────────────────────────────────────────────
+class FileBrowserStandIn(BaseHTTPRequestHandler):
+    """Just enough of the FileBrowser API for the writer: bodies are read and discarded.
+
+    tus uploads keep a SHA-256 of the bytes accepted so far (returned by HEAD as
+    X-Bench-Sha256). A tus path containing "drop_<a>_<b>..." simulates failures:
+    the PATCH that crosses offset a keeps the bytes up to a, then drops the
+    connection without replying, and so on for b.
+    """
+
+    protocol_version = "HTTP/1.1"
+    tus = {}
+    digests = {}
+    drops = {}
+    token = "eyJhbGciOiJIUzI1NiJ9." + "a" * 120 + ".sig"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, code, body=b"", headers=None):
+        self.send_response(code)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def drain(self):
+        remaining = int(self.headers.get("Content-Length", 0))
+        while remaining > 0:
+            remaining -= len(self.rfile.read(min(remaining, MB)))
+
+    def do_GET(self):
+        self.reply(200 if self.path == "/api/" else 404)
+
+    def do_HEAD(self):
+        path = self.path.split("?")[0]
+        if path in self.tus:
+            self.reply(200, headers={"Upload-Offset": str(self.tus[path]),
+                                     "X-Bench-Sha256": self.digests[path].hexdigest()})
+        else:
+            self.reply(404)
+
+    def do_POST(self):
+        self.drain()
+        path = self.path.split("?")[0]
+        if path == "/api/login":
+            self.reply(200, self.token.encode())
+        elif path.startswith("/api/tus/"):
+            self.tus[path] = 0
+            self.digests[path] = hashlib.sha256()
+            name = path.rsplit("/", 1)[-1].split(".")[0]
+            self.drops[path] = [int(n) for n in name.split("_")[1:]] if name.startswith("drop_") else []
+            self.reply(201)
+        elif path.startswith("/api/resources/"):
+            self.reply(200)
+        else:
+            self.reply(404)
+
+    def do_PATCH(self):
+        path = self.path.split("?")[0]
+        if int(self.headers["Upload-Offset"]) != self.tus.get(path):
+            self.drain()
+            self.reply(409)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        drops = self.drops[path]
+        if drops and drops[0] < self.tus[path] + length:
+            keep = drops.pop(0) - self.tus[path]
+            self.digests[path].update(self.rfile.read(keep))
+            self.tus[path] += keep
+            self.close_connection = True
+            return
+        remaining = length
+        while remaining > 0:
+            data = self.rfile.read(min(remaining, MB))
+            self.digests[path].update(data)
+            remaining -= len(data)
+        self.tus[path] += length
+        self.reply(204, headers={"Upload-Offset": str(self.tus[path])})
+
+
+def serve_filebrowser(port_queue):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FileBrowserStandIn)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+# ─────────────────────────────────────────────
+# Driver-level fakes
+# ─────────────────────────────────────────────
+class BenchDone(Exception):
+    """Raised by CountingConnection to end an otherwise endless insert loop."""
+
+
+class FakeCursor:
+    def executemany(self, sql, rows):
+        self.rowcount = len(rows)
+
+    def execute(self, sql, args=None):
+        pass
+
+    def fetchone(self):
+        return None
+
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class CountingConnection:
+    """Wrap a (real or fake) connection and stop the writer after `limit` commits."""
+
+    def __init__(self, conn, limit):
+        self.conn = conn
+        self.limit = limit
+        self.commits = 0
+
+    def cursor(self):
+        return self.conn.cursor()
+
+    def commit(self):
+        self.conn.commit()
+        self.commits += 1
+        if self.commits >= self.limit:
+            raise BenchDone()
+
+    def close(self):
+        self.conn.close()
+
+
+class FakeInsertManyResult:
+    def __init__(self, docs):
+        self.inserted_ids = [None] * len(docs)
+
+
+class FakeCollection:
+    def insert_many(self, docs, ordered=True):
+        return FakeInsertManyResult(docs)
+
+
+# ─────────────────────────────────────────────
+# Harness
+# ─────────────────────────────────────────────
+def measure(name, fn, **info):
+    """Run fn() -> (ops, bytes) and return one result row."""
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    ops, nbytes = fn()
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    result = {
+        "name": name,
+        "ops": ops,
+        "seconds": round(wall, 4),
+        "ops_per_sec": round(ops / wall, 1),
+        "mb_per_sec": round(nbytes / MB / wall, 1) if nbytes else None,
+        "cpu_us_per_op": round(cpu / ops * 1e6, 2),
+        **info,
+    }
+    print(f"{name:<40} {result['ops_per_sec']:>14,.1f} ops/s  "
+          f"{result['mb_per_sec'] or 0:>9,.1f} MB/s  {result['cpu_us_per_op']:>10,.2f} us CPU/op", file=sys.stderr)
+    return result
+
+
+def skipped(name, reason):
+    print(f"{name:<40} skipped: {reason}", file=sys.stderr)
+    return {"name": name, "skipped": reason}
+
+
+def bench_record_pool(scale):
+    from record_pool import RecordPool
+    try:
+        import faker  # RecordPool builds its values with Faker
+    except ImportError as e:
+        return [skipped("record_pool.*", str(e))]
+
+    results = [measure("record_pool.build", lambda: (RecordPool(5000), (1, 0))[1], pool_size=5000)]
+    pool = RecordPool(5000, seed=1)
+    n = int(200000 * scale)
+
+    def records():
+        for i in range(n):
+            pool.record()
+        return n, 0
+    results.append(measure("record_pool.record", records))
+    return results
+
+
+def bench_filebrowser(scale, port):
+    os.environ["BASE_URL"] = f"http://127.0.0.1:{port}"
+    try:
+        import data_writer_filebrowser as fb
+    except ImportError as e:
+        return [skipped("filebrowser.*", str(e))]
+    with open(os.path.join(CONFIG_DIR, "UPLOAD_CHUNK_KB"), "w") as fh:
+        fh.write("1024")
+    fb.CONFIG = fb.load_config()
+    chunk = int(fb.CONFIG["UPLOAD_CHUNK_KB"]) * 1024
+    results = []
+
+    n = int(512 * scale)
+
+    def generate():
+        total = sum(len(c) for c in fb.generate_file_chunks(n * MB, chunk, seed=1))
+        return n, total
+    results.append(measure("filebrowser.generate_file_chunks", generate, unit="MB"))
+
+    n = int(2000 * scale)
+
+    def reload():
+        for i in range(n):
+            fb.load_config()
+        return n, 0
+    results.append(measure("filebrowser.load_config", reload))
+
+    prober = fb.HealthProber()
+
+    def health():
+        for i in range(n):
+            assert prober.probe()
+        return n, 0
+    results.append(measure("filebrowser.health_probe", health))
+
+    token = fb.get_api_token()
+    size = 32 * MB
+    n = max(int(8 * scale), 1)
+
+    def uploads():
+        for i in range(n):
+            assert fb.upload_file(f"bench_{i}.bin", size, "bench", token, chunk)[0] == 200
+        return n, n * size
+    results.append(measure("filebrowser.upload_file", uploads, file_mb=size // MB))
+
+    def tus_uploads():
+        for i in range(n):
+            upload = {"path": f"bench/tus_{i}.bin", "size": size, "seed": i, "offset": None, "sent": 0, "resumes": 0}
+            assert fb.tus_upload(upload, token, chunk, 8 * MB) == 204
+        return n, n * size
+    results.append(measure("filebrowser.tus_upload", tus_uploads, file_mb=size // MB, tus_chunk_mb=8))
+
+    # Correctness check: resume after PATCHes that were cut off at unaligned offsets,
+    # then compare the manifest hash with what the server stored.
+    fb.CONFIG["MANIFEST_PATH"] = os.path.join(CONFIG_DIR, "manifest")
+    size = 16 * MB
+
+    def tus_resume():
+        upload = {"path": f"bench/drop_{3 * MB + 1}_{10 * MB}.bin", "size": size, "seed": 7,
+                  "offset": None, "sent": 0, "resumes": 0}
+        for attempt in range(5):
+            if fb.tus_upload(upload, token, MB, 8 * MB) == 204:
+                break
+        else:
+            raise AssertionError("resumed tus upload did not complete")
+        fb.record_manifest(upload["path"], size, upload["sha256"].hexdigest())
+        _, _, headers = fb.http_request("HEAD", fb.tus_path(upload["path"]), None, with_headers=True)
+        manifest_size, manifest_sha = fb.read_manifest(fb.CONFIG["MANIFEST_PATH"])[upload["path"]]
+        assert manifest_sha == headers["X-Bench-Sha256"], "manifest hash does not match the stored file"
+        assert manifest_sha == hashlib.sha256(b"".join(fb.generate_file_chunks(size, MB, 7))).hexdigest()
+        return 1, size
+    results.append(measure("filebrowser.tus_resume", tus_resume, file_mb=size // MB, resumes=2))
+    fb.CONFIG["MANIFEST_PATH"] = ""
+    return results
+
+
+def bench_mysql(scale):
+    try:
+        import data_writer_mysql as dm
+    except ImportError as e:
+        return [skipped("mysql.*", str(e))]
+    real = bool(os.environ.get("MYSQL_DB_HOST"))
+    results = []
+    writer = dm.TableWriter("bench", dm.DB_TABLE_NAME, "bench", "", FakeConnection)
+    writer.connect()
+    n = int(100000 * scale)
+
+    def rows():
+        for i in range(n):
+            writer.generate_row()
+        return n, 0
+    results.append(measure("mysql.generate_row", rows))
+
+    batch, commits = 100, max(int(200 * scale), 1)
+    connect = dm.connect_db if real else FakeConnection
+    writer = dm.TableWriter("bench", dm.DB_TABLE_NAME, "bench", "", lambda: CountingConnection(connect(), commits))
+    writer.connect()
+
+    def inserts():
+        try:
+            dm.insert_data(writer, sleep=0, batch_size=batch, commit_rows=batch, commit_ms=0)
+        except BenchDone:
+            pass
+        return batch * commits, 0
+    results.append(measure("mysql.insert_data", inserts, batch_size=batch, backend="mysqld" if real else "fake"))
+    return results
+
+
+def bench_mongodb(scale):
+    real = bool(os.environ.get("MONGO_DB_HOST"))
+    if not real:
+        # The writer builds its (lazily connecting) client at import time.
+        os.environ.update(MONGO_DB_HOST="localhost", MONGO_DB_PORT="27017")
+    try:
+        import data_writer_mongodb as dmg
+    except ImportError as e:
+        return [skipped("mongodb.*", str(e))]
+    results = []
+    n = int(100000 * scale)
+
+    def docs():
+        for i in range(n):
+            dmg.generate_random_data()
+        return n, 0
+    results.append(measure("mongodb.generate_random_data", docs))
+
+    coll = dmg.client[dmg.MONGO_COLLECTION_NAME]["bench"] if real else FakeCollection()
+    batch, batches = 100, max(int(200 * scale), 1)
+
+    def inserts():
+        for i in range(batches):
+            dmg.insert_batch(coll, batch)
+        return batch * batches, 0
+    results.append(measure("mongodb.insert_batch", inserts, batch_size=batch, backend="mongod" if real else "fake"))
+    if real:
+        coll.drop()
+    return results
+
+
+def bench_instrumentation(scale):
+    import metrics
+    import log_pipeline
+
+    n = int(1000000 * scale)
+
+    def observe():
+        for i in range(n):
+            metrics.observe("bench_latency_seconds", 0.002, op="bench")
+        return n, 0
+
+    def sampled_out():
+        for i in range(n):
+            log_pipeline.record("bench %s %s", i, n)
+        return n, 0
+    return [measure("metrics.observe", observe), measure("log_pipeline.record (sampled out)", sampled_out)]
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as fh:
+        baseline = {r["name"]: r for r in json.load(fh)["results"] if "ops_per_sec" in r}
+    print(f"\nvs {baseline_path}:", file=sys.stderr)
+    for r in results:
+        old = baseline.get(r["name"])
+        if old and "ops_per_sec" in r:
+            print(f"{r['name']:<40} {r['ops_per_sec'] / old['ops_per_sec']:>6.2f}x ops/s  "
+                  f"{r['cpu_us_per_op'] / old['cpu_us_per_op']:>6.2f}x CPU/op", file=sys.stderr)
+
+
+def run_suite(suite, conn):
+    """Child-process body: run one suite and send back its rows and peak RSS in MB."""
+    results = suite()
+    conn.send((results, round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)))
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every benchmark's op count")
+    parser.add_argument("--only", default="", help="run only suites whose name contains this (record_pool, "
+                                                   "filebrowser, mysql, mongodb, instrumentation)")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    # Writers configure INFO logging on import; keep per-op output out of the measurements.
+    logging.disable(logging.INFO)
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve_filebrowser, args=(port_queue,), daemon=True)
+    server.start()
+    port = port_queue.get(timeout=10)
+
+    suites = {
+        "record_pool": lambda: bench_record_pool(args.scale),
+        "filebrowser": lambda: bench_filebrowser(args.scale, port),
+        "mysql": lambda: bench_mysql(args.scale),
+        "mongodb": lambda: bench_mongodb(args.scale),
+        "instrumentation": lambda: bench_instrumentation(args.scale),
+    }
+    results, peak_rss_mb = [], {}
+    fork = multiprocessing.get_context("fork")
+    for name, suite in suites.items():
+        if args.only in name:
+            recv, send = fork.Pipe(duplex=False)
+            child = fork.Process(target=run_suite, args=(suite, send))
+            child.start()
+            send.close()
+            try:
+                rows, peak_rss_mb[name] = recv.recv()
+            except EOFError:
+                rows = None
+            child.join()
+            results += rows or [skipped(f"{name}.*", f"suite process died with exit code {child.exitcode}")]
+    server.terminate()
+
+    try:
+        version = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        version = ""
+    report = {"version": version, "python": platform.python_version(), "machine": platform.machine(),
+              "cpus": os.cpu_count(), "scale": args.scale, "peak_rss_mb": peak_rss_mb, "results": results}
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
-import subprocess, os, tempfile, time, json, random, sys, signal
+import os, time, json, random, sys, signal, queue, hashlib, itertools, threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit, quote
 from faker import Faker
+import logging
+import log_pipeline
+import metrics
 
 # ─────────────────────────────────────────────
 # Global setup
@@ -13,6 +19,7 @@ sys.stderr.reconfigure(line_buffering=True)
 fake = Faker()
 CONFIG_PATH = os.getenv("CONFIG_PATH", "/config")
 stop_requested = False  # ✅ global stop flag
+files_created = 0  # files uploaded by this client across cycles (small-files mode)
 
 # ─────────────────────────────────────────────
 # Signal handling
@@ -28,16 +35,17 @@ signal.signal(signal.SIGINT, handle_termination)
 # ─────────────────────────────────────────────
 # Utility functions
 # ─────────────────────────────────────────────
-def log(msg): print(f"[{datetime.utcnow().isoformat()}] {msg}", flush=True)
+log_pipeline.setup("[%(asctime)s] %(message)s", stream=sys.stdout, formatter=log_pipeline.UTCISOFormatter)
+
+def log(msg): logging.info("%s", msg)
+
+def log_op(fmt, *args):
+    """Per-file progress line — sampled by log_pipeline, unlike log(); %-style args are formatted only if kept."""
+    log_pipeline.record(fmt, *args)
 
 def debug(msg):
     if CONFIG.get("DEBUG", False):
-        print(f"[DEBUG {datetime.utcnow().isoformat()}] {msg}", flush=True)
-
-def run_curl(cmd):
-    """Execute shell command and capture stdout."""
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    return result.stdout.strip(), result.returncode
+        logging.info("[DEBUG] %s", msg)
 
 # ─────────────────────────────────────────────
 # Config loader
@@ -52,7 +60,27 @@ def load_config():
         "MIN_FILE_MB": "50",
         "MAX_FILE_MB": "200",
         "UPLOAD_DELAY_SEC": "15",
-        "CLEAN_TMP": "true",
+        "UPLOAD_CHUNK_KB": "1024",
+        "HTTP_TIMEOUT_SEC": "10",
+        "UPLOAD_TIMEOUT_SEC": "120",
+        "HTTP_POOL_SIZE": "4",
+        "UPLOAD_WORKERS": "1",
+        "UPLOAD_MODE": "stream",
+        "TUS_CHUNK_MB": "8",
+        "TUS_MAX_RESUMES": "10",
+        "WORKLOAD": "large",
+        "TREE_DEPTH": "2",
+        "TREE_FANOUT": "4",
+        "SMALL_FILE_MIN_KB": "1",
+        "SMALL_FILE_MAX_KB": "64",
+        "SMALL_FILE_DELAY_SEC": "0",
+        "MODE": "write",
+        "MANIFEST_PATH": "",
+        "VERIFY_WORKERS": "8",
+        "VERIFY_RANGE_MB": "16",
+        "PROBE_INTERVAL_MS": "250",
+        "PROBE_TIMEOUT_SEC": "1",
+        "PROBE_FAILURES": "2",
         "DEBUG": "false",
         "ITERATIONS": "0"
     }
@@ -62,7 +90,6 @@ def load_config():
             with open(f) as fh:
                 cfg[k] = fh.read().strip()
     cfg["DEBUG"] = cfg["DEBUG"].lower() in ("true", "1", "yes")
-    cfg["CLEAN_TMP"] = cfg["CLEAN_TMP"].lower() in ("true", "1", "yes")
     cfg["ITERATIONS"] = int(cfg["ITERATIONS"]) if str(cfg["ITERATIONS"]).isdigit() else 0
     return cfg
 
@@ -73,17 +100,70 @@ service_host = os.getenv("FILEBROWSER_SERVICE_HOST")
 service_port = os.getenv("FILEBROWSER_SERVICE_PORT", "80")
 BASE_URL = f"http://{service_host}:{service_port}" if service_host else os.getenv("BASE_URL", "http://localhost:8080")
 
+BASE = urlsplit(BASE_URL)
+BASE_PATH = BASE.path.rstrip("/")  # FileBrowser served under --baseurl, e.g. http://svc/files
+
+# ─────────────────────────────────────────────
+# HTTP connection pool (keep-alive)
+# ─────────────────────────────────────────────
+_http_pool = queue.LifoQueue()
+
+def _new_connection(timeout):
+    conn_cls = http.client.HTTPSConnection if BASE.scheme == "https" else http.client.HTTPConnection
+    return conn_cls(BASE.hostname, BASE.port, timeout=timeout)
+
+def http_request(method, path, body=None, headers=None, timeout=None, with_headers=False):
+    """Send a request over a pooled keep-alive connection.
+
+    body may be bytes or a zero-arg callable returning an iterable of chunks
+    (streamed uploads); it is re-invoked if a stale pooled connection forces a retry.
+    Returns (status, response bytes) — plus the response headers when with_headers
+    is set; status is 0 when FileBrowser is unreachable.
+    """
+    timeout = timeout or float(CONFIG.get("HTTP_TIMEOUT_SEC", 10))
+    for attempt in (1, 2):
+        try:
+            conn, reused = _http_pool.get_nowait(), True
+        except queue.Empty:
+            conn, reused = _new_connection(timeout), False
+        conn.timeout = timeout
+        if conn.sock:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request(method, BASE_PATH + path, body=body() if callable(body) else body, headers=headers or {})
+            resp = conn.getresponse()
+            data = resp.read()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            if reused and attempt == 1 and isinstance(e, (http.client.RemoteDisconnected, ConnectionError)):
+                debug(f"Stale pooled connection ({e!r}) — retrying on a fresh one.")
+                continue
+            debug(f"{method} {path} failed: {e!r}")
+            return (0, b"", {}) if with_headers else (0, b"")
+        if resp.will_close or _http_pool.qsize() >= int(CONFIG.get("HTTP_POOL_SIZE", 4)):
+            conn.close()
+        else:
+            _http_pool.put(conn)
+        return (resp.status, data, resp.headers) if with_headers else (resp.status, data)
+    return (0, b"", {}) if with_headers else (0, b"")
+
+def resource_path(remote_path):
+    return f"/api/resources/{quote(remote_path.strip('/'))}"
+
+# ─────────────────────────────────────────────
+# FileBrowser API calls
+# ─────────────────────────────────────────────
 def get_api_token():
     """Authenticate to FileBrowser and return token."""
-    cmd = (
-        f"curl -s -H 'Content-Type: application/json' "
-        f"{BASE_URL}/api/login "
-        f"--data '{{\"username\":\"{CONFIG['FB_USERNAME']}\",\"password\":\"{CONFIG['FB_PASSWORD']}\",\"recaptcha\":\"\"}}'"
-    )
-    out, _ = run_curl(cmd)
-    if not out:
+    payload = json.dumps({"username": CONFIG["FB_USERNAME"], "password": CONFIG["FB_PASSWORD"], "recaptcha": ""})
+    status, body = http_request("POST", "/api/login", payload.encode(), {"Content-Type": "application/json"})
+    out = body.decode(errors="replace").strip()
+    if status == 0 or not out:
         log("⚠️ No response from FileBrowser login — likely down.")
         return None
+    if status != 200:
+        log(f"⚠️ FileBrowser login rejected (HTTP {status}).")
+        return None
     if out.count('.') == 2 and len(out) > 100:
         log("✅ Detected raw JWT token (plain text mode).")
         return out
@@ -93,49 +173,317 @@ def get_api_token():
         debug(f"Non-JSON login response: {out[:200]}")
         return None
 
-def check_health():
-    """Check FileBrowser health by hitting /api/."""
-    cmd = f"curl -s -o /dev/null -w '%{{http_code}}' {BASE_URL}/api/"
-    out, _ = run_curl(cmd)
-    return out == "200"
+class HealthProber:
+    """Probe /api/ on a background thread and keep FileBrowser's health state current.
+
+    The upload loop reads healthy without blocking. An outage is declared after
+    PROBE_FAILURES failed probes in a row and starts when the first of them was sent;
+    it ends when the first good probe is answered. Both ends are taken from the
+    monotonic clock, so RTO is accurate to about one PROBE_INTERVAL_MS.
+    """
+
+    def __init__(self):
+        self.up = threading.Event()
+        self.up.set()
+        self.wake = threading.Event()
+        self.probed = threading.Condition()
+        self.probes = 0
+        self.conn = None
+        self.failures = 0
+        self.first_failure = None
+        self.down_mono = self.down_at = None
+        self.outages = 0
+        self.last_write = None  # newest completed upload, for RPO
+
+    @property
+    def healthy(self):
+        return self.up.is_set()
+
+    def wait_healthy(self, timeout):
+        return self.up.wait(timeout)
+
+    def next_probe(self, timeout=None):
+        """Probe now and wait for the verdict — used after an upload could not reach FileBrowser."""
+        with self.probed:
+            seen = self.probes
+            self.wake.set()
+            self.probed.wait_for(lambda: self.probes > seen, timeout or float(CONFIG["PROBE_TIMEOUT_SEC"]) + 1)
+        return self.healthy
+
+    def start(self):
+        threading.Thread(target=self.run, name="health-prober", daemon=True).start()
+
+    def probe(self):
+        # Own keep-alive connection, so a probe never queues behind uploads in the pool.
+        timeout = float(CONFIG["PROBE_TIMEOUT_SEC"])
+        try:
+            if self.conn is None:
+                self.conn = _new_connection(timeout)
+            elif self.conn.sock:
+                self.conn.sock.settimeout(timeout)
+            self.conn.request("GET", f"{BASE_PATH}/api/")
+            resp = self.conn.getresponse()
+            resp.read()
+            if resp.will_close:
+                self.conn.close()
+                self.conn = None
+            return resp.status == 200
+        except (http.client.HTTPException, OSError) as e:
+            debug(f"Health probe failed: {e!r}")
+            self.conn.close()
+            self.conn = None
+            return False
+
+    def run(self):
+        while not stop_requested:
+            sent_mono, sent_at = time.monotonic(), datetime.utcnow()
+            if self.probe():
+                self.mark_up()
+            else:
+                self.mark_down(sent_mono, sent_at)
+            with self.probed:
+                self.probes += 1
+                self.probed.notify_all()
+            self.wake.wait(max(float(CONFIG["PROBE_INTERVAL_MS"]) / 1000 - (time.monotonic() - sent_mono), 0))
+            self.wake.clear()
+
+    def mark_down(self, sent_mono, sent_at):
+        self.failures += 1
+        if self.failures == 1:
+            self.first_failure = (sent_mono, sent_at)
+        if self.failures < int(CONFIG["PROBE_FAILURES"]) or not self.healthy:
+            return
+        self.down_mono, self.down_at = self.first_failure
+        self.outages += 1
+        self.up.clear()
+        metrics.gauge("outage", 1)
+        metrics.inc("outages_total")
+        log(f"[RPO-RTO] ⚠️ FileBrowser UNREACHABLE since {self.down_at.isoformat()} — pausing uploads")
+
+    def mark_up(self):
+        self.failures = 0
+        if self.healthy:
+            return
+        rto = time.monotonic() - self.down_mono
+        recovery_time = datetime.utcnow()
+        rpo = (recovery_time - self.last_write).total_seconds() if self.last_write else 0
+        log(f"[RPO-RTO] ✅ FileBrowser RECOVERED at {recovery_time.isoformat()} | 🕓 RTO={rto:.3f}s | 💾 RPO={rpo:.1f}s")
+        metrics.gauge("outage", 0)
+        metrics.gauge("rto_seconds", rto)
+        metrics.gauge("rpo_seconds", rpo)
+        self.up.set()
+
+def auth_headers(token):
+    return {"X-Auth": token} if token else {}
 
 def create_folder(folder_name, token):
     folder_name = folder_name.strip("/")
-    auth = f"--header X-Auth:{token}" if token else ""
-    cmd = (
-        f"curl -s -o /dev/null -w '%{{http_code}}' "
-        f"{BASE_URL}/api/resources/{folder_name}/?override=false "
-        f"--data '{{}}' {auth}"
-    )
-    code, _ = run_curl(cmd)
-    log(f"📁 Folder '{folder_name}' → HTTP {code}")
+    code, _ = http_request("POST", f"{resource_path(folder_name)}/?override=false", b"{}", auth_headers(token))
+    log_op("📁 Folder '%s' → HTTP %s", folder_name, code)
     return code
 
-def upload_file(local_path, remote_folder, token):
-    auth = f"-H 'X-Auth:{token}'" if token else ""
-    cmd = (
-        f"curl -s -o /dev/null -w '%{{http_code}}' "
-        f"-X POST {auth} "
-        f"-F 'files=@{local_path}' "
-        f"{BASE_URL}/api/resources/{remote_folder}/{os.path.basename(local_path)}?override=false"
+def upload_file(file_name, size_bytes, remote_folder, token, chunk_size):
+    """Stream generated data as the request body — no temp file, no full buffer in RAM.
+
+    Returns the HTTP status and, when MANIFEST_PATH is set, the SHA-256 of the body
+    hashed in the same pass (None otherwise).
+    """
+    headers = {"Content-Type": "application/octet-stream", "Content-Length": str(size_bytes), **auth_headers(token)}
+    seed = random.getrandbits(32)
+    digest = None
+
+    def body():
+        nonlocal digest
+        if not CONFIG["MANIFEST_PATH"]:
+            return generate_file_chunks(size_bytes, chunk_size, seed)
+        digest = hashlib.sha256()  # restarted if a stale connection forces a resend
+        return hashed(generate_file_chunks(size_bytes, chunk_size, seed), digest)
+
+    code, _ = http_request(
+        "POST", f"{resource_path(f'{remote_folder}/{file_name}')}?override=false",
+        body, headers, timeout=float(CONFIG["UPLOAD_TIMEOUT_SEC"]),
     )
-    code, _ = run_curl(cmd)
-    log(f"📤 Upload {os.path.basename(local_path)} → {remote_folder} [{code}]")
+    log_op("📤 Upload %s → %s [%s]", file_name, remote_folder, code)
+    return code, digest.hexdigest() if digest else None
+
+def hashed(chunks, digest):
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+def generate_file_chunks(size_bytes, chunk_size, seed=None, start=0):
+    """Yield bytes [start, size_bytes) of a pseudo-random file in fixed-size chunks (bounded memory).
+
+    Each chunk_size block is derived from (seed, block index), so the same file can be
+    regenerated from any offset — this is what lets tus uploads resume mid-file.
+    """
+    seed = random.getrandbits(32) if seed is None else seed
+    block, skip = divmod(start, chunk_size)
+    pos = block * chunk_size
+    while pos < size_bytes:
+        # Always draw the full block: randbytes(n) is not a prefix of randbytes(chunk_size) for every n.
+        end = min(chunk_size, size_bytes - pos)
+        data = random.Random((seed << 32) + block).randbytes(chunk_size)
+        yield data[skip:end] if skip or end < chunk_size else data
+        pos += end
+        block, skip = block + 1, 0
+
+# ─────────────────────────────────────────────
+# Resumable uploads (tus protocol, /api/tus)
+# ─────────────────────────────────────────────
+TUS_HEADERS = {"Tus-Resumable": "1.0.0"}
+
+def tus_path(remote_path):
+    return f"/api/tus/{quote(remote_path.strip('/'))}"
+
+def tus_offset(upload, token):
+    """Ask FileBrowser how many bytes of the upload it has acknowledged.
+
+    Returns (HTTP status, offset); offset is None when it is unknown.
+    """
+    code, _, headers = http_request("HEAD", tus_path(upload["path"]), None,
+                                    {**TUS_HEADERS, **auth_headers(token)}, with_headers=True)
+    if code != 200 or headers.get("Upload-Offset") is None:
+        debug(f"tus HEAD {upload['path']} → HTTP {code}")
+        return code, None
+    return code, int(headers["Upload-Offset"])
+
+def tus_restart(upload, code):
+    """The server lost the upload (e.g. FileBrowser restarted) — start it again from byte 0."""
+    log(f"⚠️ tus upload {upload['path']} is gone on the server (HTTP {code}) — restarting it from 0 MB")
+    upload["offset"], upload["hashed"] = None, 0
+    upload["sha256"] = hashlib.sha256() if CONFIG["MANIFEST_PATH"] else None
+
+def tus_upload(upload, token, chunk_size, tus_chunk):
+    """Create (first attempt) or resume a tus upload and PATCH it to completion.
+
+    upload is a dict (path, size, seed, offset, sent, resumes) that survives failed
+    attempts, so the caller can hand it back after an outage. Returns the HTTP status
+    of the last request; 204 means the whole file has been acknowledged, and
+    upload["sha256"] then holds the digest of the whole file (if MANIFEST_PATH is set).
+    """
+    headers = {**TUS_HEADERS, **auth_headers(token)}
+    upload.setdefault("sha256", hashlib.sha256() if CONFIG["MANIFEST_PATH"] else None)
+    upload.setdefault("hashed", 0)
+    if upload["offset"] is not None:
+        code, acked = tus_offset(upload, token)
+        if code in (404, 410):
+            tus_restart(upload, code)
+        elif acked is None:
+            return code if code != 200 else 0
+        else:
+            upload["offset"] = acked
+            upload["resumes"] += 1
+            log(f"⏯️ Resuming {upload['path']} at {acked / 1048576:.1f}/{upload['size'] / 1048576:.1f} MB")
+
+    def counted(chunks, pos):
+        digest = upload["sha256"]
+        for chunk in chunks:
+            upload["sent"] += len(chunk)
+            metrics.inc("bytes_sent_total", len(chunk))
+            # Bytes re-sent after a resume were hashed the first time round.
+            pos += len(chunk)
+            new = min(pos - upload["hashed"], len(chunk))
+            if digest and new > 0:
+                digest.update(chunk[-new:])
+                upload["hashed"] = pos
+            yield chunk
+
+    code, conflicts = 204, 0
+    while upload["offset"] is None or upload["offset"] < upload["size"]:
+        if upload["offset"] is None:
+            code, _ = http_request("POST", f"{tus_path(upload['path'])}?override=false", b"",
+                                   {**headers, "Upload-Length": str(upload["size"])})
+            if code not in (200, 201):
+                return code
+            upload["offset"] = 0
+            continue
+        start = upload["offset"]
+        end = min(start + tus_chunk, upload["size"])
+        code, _, resp_headers = http_request(
+            "PATCH", tus_path(upload["path"]),
+            lambda: counted(generate_file_chunks(end, chunk_size, upload["seed"], start), start),
+            {**headers, "Content-Type": "application/offset+octet-stream",
+             "Upload-Offset": str(start), "Content-Length": str(end - start)},
+            timeout=float(CONFIG["UPLOAD_TIMEOUT_SEC"]), with_headers=True,
+        )
+        if code == 409 and conflicts < 3:
+            # Offset mismatch — the server kept part of a dropped PATCH, or lost the upload; re-sync and carry on.
+            conflicts += 1
+            code, acked = tus_offset(upload, token)
+            if code in (404, 410):
+                tus_restart(upload, code)
+            elif acked is None:
+                return code if code != 200 else 0
+            else:
+                upload["offset"] = acked
+            continue
+        if code != 204:
+            return code
+        upload["offset"], conflicts = int(resp_headers.get("Upload-Offset", end)), 0
     return code
 
-def create_large_file(file_path, min_mb, max_mb):
-    """Generate random binary file of size MB."""
-    size_mb = random.randint(min_mb, max_mb)
-    log(f"💾 Writing {size_mb} MB → {file_path}")
-    with open(file_path, "wb") as f:
-        f.write(os.urandom(size_mb * 1024 * 1024))
-    return size_mb
+# ─────────────────────────────────────────────
+# Small-files workload (directory fan-out)
+# ─────────────────────────────────────────────
+def create_tree(root, depth, fanout, token, pool):
+    """Create root and a depth-level tree with fanout sub-folders per folder, one level at a time.
+
+    Returns the leaf folders and the latency of every folder creation.
+    """
+    def mkdir(path):
+        start = time.monotonic()
+        code = create_folder(path, token)
+        elapsed = time.monotonic() - start
+        metrics.observe("write_latency_seconds", elapsed, op="mkdir")
+        if code not in (200, 201):
+            metrics.inc("errors_total", type=f"http_{code}")
+        return elapsed
+
+    latencies = [mkdir(root)]
+    level = [root]
+    for d in range(depth):
+        level = [f"{parent}/d{d}_{i}" for parent in level for i in range(fanout)]
+        latencies += pool.map(mkdir, level)
+    return level, latencies
+
+def latency_summary(values):
+    if not values:
+        return "n/a"
+    v = sorted(values)
+    pick = lambda p: v[min(len(v) - 1, int(len(v) * p / 100))] * 1000
+    return f"p50={pick(50):.0f}ms p95={pick(95):.0f}ms p99={pick(99):.0f}ms max={v[-1] * 1000:.0f}ms"
 
 # ─────────────────────────────────────────────
 # Upload cycle (main work unit)
 # ─────────────────────────────────────────────
+def upload_task(file_name, size_bytes, remote_folder, token, chunk_size, upload=None):
+    """Run one upload on a worker thread and return what the cycle needs to account for it.
+
+    In tus mode the upload state is returned as well, so a transfer interrupted by an
+    outage can be resumed instead of started over.
+    """
+    start = time.monotonic()
+    if CONFIG["UPLOAD_MODE"] == "tus":
+        upload = upload or {"path": f"{remote_folder}/{file_name}", "size": size_bytes,
+                            "seed": random.getrandbits(32), "offset": None, "sent": 0, "resumes": 0,
+                            "requeued": 0}
+        code = tus_upload(upload, token, chunk_size, int(CONFIG["TUS_CHUNK_MB"]) * 1024 * 1024)
+        log_op("📤 tus upload %s [%s]", upload["path"], code)
+        path, size_bytes, sha256 = upload["path"], upload["size"], upload["sha256"] and upload["sha256"].hexdigest()
+    else:
+        code, sha256 = upload_file(file_name, size_bytes, remote_folder, token, chunk_size)
+        path = f"{remote_folder}/{file_name}"
+    return code, path, size_bytes, sha256, token, datetime.utcnow(), time.monotonic() - start, upload
+
+def record_manifest(path, size_bytes, sha256):
+    """Append one acknowledged file to MANIFEST_PATH as "<sha256> <size> <path>"."""
+    if CONFIG["MANIFEST_PATH"]:
+        with open(CONFIG["MANIFEST_PATH"], "a") as fh:
+            fh.write(f"{sha256} {size_bytes} {path}\n")
+
 def upload_cycle(token, iteration, last_upload_time):
-    global stop_requested
+    global stop_requested, files_created
     CONFIG.update(load_config())
 
     upload_minutes = int(CONFIG["UPLOAD_MINUTES"])
@@ -143,61 +491,257 @@ def upload_cycle(token, iteration, last_upload_time):
     min_mb = int(CONFIG["MIN_FILE_MB"])
     max_mb = int(CONFIG["MAX_FILE_MB"])
     delay_sec = int(CONFIG["UPLOAD_DELAY_SEC"])
+    chunk_size = int(CONFIG["UPLOAD_CHUNK_KB"]) * 1024
+    workers = max(1, int(CONFIG["UPLOAD_WORKERS"]))
+    # One keep-alive connection per worker, so extra workers don't open a new TCP connection per request.
+    CONFIG["HTTP_POOL_SIZE"] = str(max(int(CONFIG["HTTP_POOL_SIZE"]), workers))
+    small_files = CONFIG["WORKLOAD"] == "smallfiles"
+    if small_files:
+        delay_sec = float(CONFIG["SMALL_FILE_DELAY_SEC"])
+        min_kb = int(CONFIG["SMALL_FILE_MIN_KB"])
+        max_kb = int(CONFIG["SMALL_FILE_MAX_KB"])
 
     root = f"data_{fake.word()}"
-    sub = f"{root}/{fake.word()}_{fake.random_int(1,100)}"
-    create_folder(root, token)
-    create_folder(sub, token)
+    if not small_files:
+        sub = f"{root}/{fake.word()}_{fake.random_int(1,100)}"
+        create_folder(root, token)
+        create_folder(sub, token)
 
     end_time = datetime.utcnow() + timedelta(minutes=upload_minutes)
-    outage_start = None
-
-    while datetime.utcnow() < end_time and not stop_requested:
-        if not check_health():
-            if not outage_start:
-                outage_start = datetime.utcnow()
-                log(f"[RPO-RTO] ⚠️ FileBrowser UNREACHABLE — pausing uploads (detected at {outage_start.isoformat()})")
-            time.sleep(15)
-            continue
-        elif outage_start:
-            recovery_time = datetime.utcnow()
-            rto = (recovery_time - outage_start).total_seconds()
-            rpo = (recovery_time - last_upload_time).total_seconds() if last_upload_time else 0
-            log(f"[RPO-RTO] ✅ FileBrowser RECOVERED at {recovery_time.isoformat()} | 🕓 RTO={rto:.1f}s | 💾 RPO={rpo:.1f}s")
-            outage_start = None
-
-        tmp_file = os.path.join(tempfile.gettempdir(), f"{fake.word()}.bin")
-        size_mb = create_large_file(tmp_file, min_mb, max_mb)
-        code = upload_file(tmp_file, sub, token)
-        if code in ("401", "403"):
-            log("🔐 Token expired — re-login.")
-            token = get_api_token()
-        elif code in ("200", "201"):
-            last_upload_time = datetime.utcnow()
+    outages_seen = prober.outages
+    cycle_start = time.monotonic()
+    uploads_started = files_ok = bytes_ok = unreachable = 0
+    upload_latencies = []
+    pending = []  # interrupted tus uploads waiting to be resumed
+
+    def account(fut):
+        """Fold a finished upload into the shared token / RPO state (coordinator thread only)."""
+        nonlocal token, last_upload_time, files_ok, bytes_ok, unreachable
+        code, path, size_bytes, sha256, used_token, finished_at, elapsed, upload = fut.result()
+        if code not in (200, 201, 204):
+            metrics.inc("errors_total", type=f"http_{code}")
+        if code == 0:
+            unreachable += 1
+        resumable = upload is not None and upload["offset"] is not None
+        if code in (401, 403):
+            # Several workers can fail with the same expired token — refresh it only once.
+            if used_token == token:
+                log("🔐 Token expired — re-login.")
+                token = get_api_token()
+            if resumable:
+                pending.append(upload)
+        elif code in (200, 201, 204):
+            files_ok += 1
+            bytes_ok += size_bytes
+            upload_latencies.append(elapsed)
+            record_manifest(path, size_bytes, sha256)
+            metrics.inc("records_written_total")
+            metrics.inc("bytes_written_total", size_bytes)
+            metrics.observe("write_latency_seconds", elapsed, op="upload")
+            # Uploads finish out of order; RPO tracks the newest completed one.
+            last_upload_time = max(last_upload_time or finished_at, finished_at)
+            prober.last_write = last_upload_time
+            debug(f"Upload finished in {elapsed:.1f}s ({size_bytes / 1048576 / max(elapsed, 1e-6):.1f} MB/s)")
+            if upload and upload["resumes"]:
+                resent = upload["sent"] - upload["size"]
+                log(f"[RPO-RTO] ⏯️ Resumed upload {upload['path']} completed after {upload['resumes']} resume(s) "
+                    f"| 🔁 re-sent {resent / 1048576:.1f} MB of {upload['size'] / 1048576:.1f} MB")
+        elif resumable and code == 0 and upload["requeued"] < int(CONFIG["TUS_MAX_RESUMES"]):
+            upload["requeued"] += 1
+            log(f"⚠️ Upload interrupted (HTTP {code}) at {upload['offset'] / 1048576:.1f} MB — will resume")
+            pending.append(upload)
+        elif resumable:
+            log(f"⚠️ Abandoning upload {upload['path']} (HTTP {code}) at {upload['offset'] / 1048576:.1f}/"
+                f"{upload['size'] / 1048576:.1f} MB after {upload['requeued']} resume attempt(s)")
         else:
             log(f"⚠️ Upload failed (HTTP {code})")
-        
-        # 🧹 Clean up temp file if enabled
-        if CONFIG.get("CLEAN_TMP", True):
-            try:
-                os.remove(tmp_file)
-                debug(f"🧹 Deleted temp file {tmp_file}")
-            except Exception as e:
-                debug(f"⚠️ Could not delete temp file {tmp_file}: {e}")
-        
-        time.sleep(delay_sec)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload") as pool:
+        if small_files:
+            depth, fanout = int(CONFIG["TREE_DEPTH"]), int(CONFIG["TREE_FANOUT"])
+            tree_start = time.monotonic()
+            folders, mkdir_latencies = create_tree(root, depth, fanout, token, pool)
+            log(f"🌳 Created {len(mkdir_latencies)} folder(s) under {root} (depth {depth}, fan-out {fanout}) "
+                f"in {time.monotonic() - tree_start:.1f}s | mkdir {latency_summary(mkdir_latencies)}")
+        else:
+            folders = [sub]
+        inflight = set()
+        while datetime.utcnow() < end_time and not stop_requested:
+            if not prober.healthy:
+                prober.wait_healthy(1)
+                continue
+            if prober.outages != outages_seen:
+                outages_seen = prober.outages
+                if pending:
+                    acked = [tus_offset(u, token)[1] or 0 for u in pending]
+                    kept = sum(acked)
+                    resend = sum(max(u["sent"] - a, 0) for u, a in zip(pending, acked))
+                    log(f"[RPO-RTO] ⏯️ Resuming {len(pending)} upload(s) after the outage: {kept / 1048576:.1f} MB kept, "
+                        f"{resend / 1048576:.1f} MB sent before the outage must be re-sent")
+
+            while pending and len(inflight) < workers:
+                upload = pending.pop(0)
+                inflight.add(pool.submit(upload_task, None, None, None, token, chunk_size, upload))
+
+            while len(inflight) < workers:
+                uploads_started += 1
+                folder = folders[uploads_started % len(folders)]
+                if small_files:
+                    file_name = f"f_{uploads_started}.bin"
+                    size_bytes = random.randint(min_kb, max_kb) * 1024
+                    log_op("💾 Uploading %d KB → %s/%s", size_bytes // 1024, folder, file_name)
+                else:
+                    file_name = f"{fake.word()}_{uploads_started}.bin"
+                    size_bytes = random.randint(min_mb, max_mb) * 1024 * 1024
+                    log_op("💾 Streaming %d MB → %s/%s", size_bytes // 1048576, folder, file_name)
+                inflight.add(pool.submit(upload_task, file_name, size_bytes, folder, token, chunk_size))
+
+            done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                account(fut)
+            if unreachable:
+                # Don't spin on instant connection errors until the prober declares the outage.
+                unreachable = 0
+                prober.next_probe()
+
+            time.sleep(delay_sec)
+
+        for fut in inflight:
+            account(fut)
+
+    for upload in pending:
+        log(f"⚠️ Abandoning interrupted upload {upload['path']} at "
+            f"{(upload['offset'] or 0) / 1048576:.1f}/{upload['size'] / 1048576:.1f} MB (cycle ended)")
+
+    elapsed = time.monotonic() - cycle_start
+    mb_ok = bytes_ok / 1048576
+    log(f"📊 Cycle {iteration}: {files_ok} file(s), {mb_ok:.1f} MB in {elapsed:.1f}s → "
+        f"{mb_ok / max(elapsed, 1e-6):.1f} MB/s aggregate ({workers} worker(s))")
+    if small_files:
+        files_created += files_ok
+        metrics.gauge("files_created", files_created)
+        log(f"📊 Cycle {iteration}: {files_ok / max(elapsed, 1e-6):.1f} files/s across {len(folders)} folder(s) | "
+            f"upload {latency_summary(upload_latencies)} | {files_created} files written by this client so far")
 
     log(f"🕒 Cooling down {cooldown_minutes} min …")
     time.sleep(cooldown_minutes * 60)
     return token, last_upload_time
 
+# ─────────────────────────────────────────────
+# Read-back verification (MODE=verify)
+# ─────────────────────────────────────────────
+def read_manifest(path):
+    """Return {path: (size, sha256)}; a later line for the same path wins, a torn last line is skipped."""
+    entries = {}
+    with open(path) as fh:
+        for line in fh:
+            parts = line.rstrip("\n").split(" ", 2)
+            if len(parts) == 3 and len(parts[0]) == 64 and parts[1].isdigit():
+                entries[parts[2]] = (int(parts[1]), parts[0])
+    return entries
+
+def verify_file(path, size_bytes, sha256, token, range_bytes):
+    """Download one file in range requests, hashing as it arrives. Returns (result, bytes read)."""
+    digest = hashlib.sha256()
+    pos = 0
+    while pos < size_bytes:
+        end = min(pos + range_bytes, size_bytes) - 1
+        code, data, headers = http_request(
+            "GET", f"/api/raw/{quote(path.strip('/'))}", None,
+            {**auth_headers(token), "Range": f"bytes={pos}-{end}"},
+            timeout=float(CONFIG["UPLOAD_TIMEOUT_SEC"]), with_headers=True,
+        )
+        if code == 404:
+            return "missing", pos
+        if code not in (200, 206):
+            return f"http_{code}", pos
+        if code == 206 and headers.get("Content-Range", "").rpartition("/")[2] not in (str(size_bytes), "*"):
+            return "size", pos
+        digest.update(data)
+        pos += len(data)
+        if code == 200 or not data:
+            break  # the server ignored the range and sent the whole file
+    if pos != size_bytes:
+        return "size", pos
+    return ("ok" if digest.hexdigest() == sha256 else "mismatch"), pos
+
+def verify_uploads(token):
+    """Read every file in MANIFEST_PATH back from FileBrowser and compare its SHA-256.
+
+    Files are verified VERIFY_WORKERS at a time, each one in VERIFY_RANGE_MB range
+    requests, so memory stays bounded however large the files are. Files left
+    unread (stopped early) are counted as "unchecked".
+    """
+    entries = read_manifest(CONFIG["MANIFEST_PATH"])
+    total_bytes = sum(size for size, _ in entries.values())
+    workers = max(1, int(CONFIG["VERIFY_WORKERS"]))
+    range_bytes = int(CONFIG["VERIFY_RANGE_MB"]) * 1024 * 1024
+    CONFIG["HTTP_POOL_SIZE"] = str(max(int(CONFIG["HTTP_POOL_SIZE"]), workers))
+    log(f"🔎 Verifying {len(entries)} file(s), {total_bytes / 1073741824:.1f} GB from {CONFIG['MANIFEST_PATH']} "
+        f"({workers} worker(s), {range_bytes // 1048576} MB ranges)")
+
+    results = {}
+    checked = bytes_read = 0
+    retried = set()
+    start = last_report = time.monotonic()
+    todo = iter(entries.items())
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verify") as pool:
+        inflight = {}
+        while not stop_requested:
+            for path, (size, sha256) in itertools.islice(todo, workers - len(inflight)):
+                inflight[pool.submit(verify_file, path, size, sha256, token, range_bytes)] = path
+            if not inflight:
+                break
+            done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                path = inflight.pop(fut)
+                result, read = fut.result()
+                bytes_read += read
+                if result in ("http_401", "http_403") and path not in retried:
+                    log("🔐 Token expired — re-login.")
+                    token = get_api_token()
+                    retried.add(path)
+                    size, sha256 = entries[path]
+                    inflight[pool.submit(verify_file, path, size, sha256, token, range_bytes)] = path
+                    continue
+                checked += 1
+                results[result] = results.get(result, 0) + 1
+                metrics.inc("verified_files_total", result=result)
+                if result == "ok":
+                    log_op("✅ %s verified", path)
+                else:
+                    logging.warning("❌ %s: %s (%d of %d bytes read)", path, result, read, entries[path][0])
+            if time.monotonic() - last_report >= 30:
+                last_report = time.monotonic()
+                log(f"🔎 Verified {checked}/{len(entries)} file(s), {bytes_read / 1073741824:.1f} GB "
+                    f"({bytes_read / 1048576 / (last_report - start):.0f} MB/s)")
+
+    if checked < len(entries):
+        results["unchecked"] = len(entries) - checked
+    elapsed = time.monotonic() - start
+    log(f"🔎 Verification finished: {checked}/{len(entries)} file(s), {bytes_read / 1073741824:.1f} GB in {elapsed:.1f}s "
+        f"({bytes_read / 1048576 / max(elapsed, 1e-6):.0f} MB/s) | "
+        + ", ".join(f"{k}={v}" for k, v in sorted(results.items())))
+    return results
+
 # ─────────────────────────────────────────────
 # Main loop with config watcher
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
     log(f"🌐 FileBrowser Client starting | Base URL: {BASE_URL}")
+    metrics.start_server()
     CONFIG = load_config()
+    prober = HealthProber()
+    prober.start()
     token = get_api_token()
+    if CONFIG["MODE"] == "verify":
+        if not CONFIG["MANIFEST_PATH"]:
+            raise SystemExit("❌ Cannot verify uploads: MANIFEST_PATH is not set.")
+        if not token:
+            raise SystemExit("❌ Cannot verify uploads: FileBrowser login failed.")
+        results = verify_uploads(token)
+        # An empty manifest or a run stopped early verified nothing it can vouch for.
+        raise SystemExit(0 if set(results) == {"ok"} else 1)
     iteration = 1
     last_upload_time = None
     total_iters = CONFIG.get("ITERATIONS", 0)
@@ -216,19 +760,19 @@ if __name__ == "__main__":
             last_config_snapshot = CONFIG.copy()
 
         # 🧩 Handle login retry if FileBrowser unreachable
-        if not token or not check_health():
+        if not token or not prober.healthy:
             log("[AUTH] ⚠️ FileBrowser unreachable, starting health retry loop...")
             while not stop_requested:
-                if check_health():
+                if prober.wait_healthy(10):
                     log("[AUTH] ✅ FileBrowser reachable again — logging in...")
                     token = get_api_token()
                     if token:
                         log("[AUTH] 🔓 Login successful — resuming operations.")
                         retry_delay = 30
                         break
+                    time.sleep(10)
                 else:
-                    log("[AUTH] ⏳ Still unreachable, re-checking in 10 s...")
-                time.sleep(10)
+                    log("[AUTH] ⏳ Still unreachable, waiting for the health prober...")
             if not token:
                 log("💤 Still no token, retrying later...")
                 time.sleep(retry_delay)
@@ -1,16 +1,22 @@
+import asyncio
 import pymongo
+from pymongo.write_concern import WriteConcern
 import time
-import string
+import uuid
 import logging
 import socket
-import secrets
+import threading
 from datetime import datetime
-from faker import Faker
+import log_pipeline
+from record_pool import RecordPool
+from rpo_rto import WriteSequence, OutageMonitor, OutageProbe
+import metrics
 import random
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-logging.basicConfig(
-    format="%(asctime)s - %(threadName)s - %(name)s - %(levelname)s - %(message)s",
+log_pipeline.setup(
+    "%(asctime)s - %(threadName)s - %(name)s - %(levelname)s - %(message)s",
     level=logging.INFO,
 )
 
@@ -21,8 +27,35 @@ DB_PORT = os.environ.get("MONGO_DB_PORT")
 MONGO_URI = f"mongodb://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/"
 DB_NAME = "mycollection"
 MONGO_COLLECTION_NAME = "mycollection"
-fake = Faker()
-client = pymongo.MongoClient(MONGO_URI)
+# Bulk mode (MONGO_BATCH_SIZE > 0): insert_many batches, several in flight at once.
+BATCH_SIZE = int(os.environ.get("MONGO_BATCH_SIZE", 0))
+INFLIGHT_BATCHES = int(os.environ.get("MONGO_INFLIGHT_BATCHES", 1))
+BULK_ROUND_SEC = float(os.environ.get("MONGO_BULK_ROUND_SEC", 30))
+WRITE_W = os.environ.get("MONGO_WRITE_W", "1")
+WRITE_J = os.environ.get("MONGO_WRITE_J", "")
+WRITE_WTIMEOUT_MS = int(os.environ.get("MONGO_WRITE_WTIMEOUT_MS", 0))
+# Async engine (MONGO_ENGINE=async): this many insert and read operations kept in flight.
+ENGINE = os.environ.get("MONGO_ENGINE", "sync")
+ASYNC_INSERTS = int(os.environ.get("MONGO_ASYNC_INSERTS", 32))
+ASYNC_READS = int(os.environ.get("MONGO_ASYNC_READS", 4))
+ASYNC_REPORT_SEC = float(os.environ.get("MONGO_ASYNC_REPORT_SEC", 10))
+# Outage handling: a short server selection timeout makes failed writes surface quickly, and a background
+# ping every MONGO_PROBE_INTERVAL seconds (MONGO_PROBE_FAILURES misses in a row) catches outages that start
+# while the writer sleeps.
+SEQ_FILE = os.environ.get("MONGO_SEQ_FILE", "")
+PROBE_INTERVAL = float(os.environ.get("MONGO_PROBE_INTERVAL", 0.2))
+PROBE_FAILURES = int(os.environ.get("MONGO_PROBE_FAILURES", 2))
+SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 2000))
+# Lag probe (MONGO_LAG_PROBE_SEC > 0): a marker write every N seconds, timed until each member can read it.
+LAG_PROBE_SEC = float(os.environ.get("MONGO_LAG_PROBE_SEC", 0))
+LAG_POLL_MS = float(os.environ.get("MONGO_LAG_POLL_MS", 5))
+LAG_TIMEOUT_SEC = float(os.environ.get("MONGO_LAG_TIMEOUT_SEC", 30))
+LAG_REPORT_SEC = float(os.environ.get("MONGO_LAG_REPORT_SEC", 10))
+LAG_COLLECTION = "lag_probe"
+records = RecordPool()
+sequence = WriteSequence(SEQ_FILE)
+monitor = OutageMonitor("MongoDB")
+client = pymongo.MongoClient(MONGO_URI, serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS)
 
 
 def create_db():
@@ -45,21 +78,22 @@ def create_db():
 
 
 def generate_random_data():
+    r = records.record()
     data = {
         "date_time": str(datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")),
-        "res": "".join(
-            secrets.choice(string.ascii_uppercase + string.digits) for i in range(10)
-        ),
+        "res": r["res"],
         "host": socket.gethostname(),
-        "first_name": fake.first_name(),
-        "last_name": fake.last_name(),
-        "email": fake.email(),
-        "zipcode": fake.postcode(),
-        "city": fake.city(),
-        "country": fake.country(),
-        "address": fake.address(),
-        "latitude": str(fake.latitude()),
-        "longitude": str(fake.longitude()),
+        "first_name": r["first_name"],
+        "last_name": r["last_name"],
+        "email": r["email"],
+        "zipcode": r["zipcode"],
+        "city": r["city"],
+        "country": r["country"],
+        "address": r["address"],
+        "latitude": r["latitude"],
+        "longitude": r["longitude"],
+        "seq": sequence.take(),
+        "ts": datetime.utcnow(),
     }
     return data
 
@@ -68,27 +102,344 @@ def generate_random_data():
 def insert_random_data():
     for x in range(0, 5):
         data = generate_random_data()
-        collection.insert_one(data)
-        logging.info(f"Inserted data: {data}")
+        start = time.monotonic()
+        try:
+            collection.insert_one(data)
+        except pymongo.errors.ConnectionFailure as e:
+            handle_outage(e, data["ts"])
+            continue
+        elapsed = time.monotonic() - start
+        sequence.commit(data["seq"], data["ts"])
+        monitor.ok()
+        metrics.inc("records_written_total")
+        metrics.observe("write_latency_seconds", elapsed, op="insert_one")
+        metrics.inc("bytes_written_total", len(data["res"]))
+        log_pipeline.record("Inserted data in %.1f ms: %s", elapsed * 1000, log_pipeline.Truncated(data))
         time.sleep(5)
     logging.info('\n')
 
 
+def durable_seq():
+    """Return (seq, ts) of this host's newest document the database still holds."""
+    doc = collection.find_one({"host": socket.gethostname()}, {"seq": 1, "ts": 1}, sort=[("seq", -1)])
+    return (doc["seq"], doc.get("ts")) if doc else (0, None)
+
+
+def handle_outage(error, since):
+    sequence.rollback()
+    metrics.inc("errors_total", type=type(error).__name__)
+    # A write sent before the probe closed the last outage is ignored by failed(): that outage is already measured.
+    monitor.failed(error, since)
+    wait_for_recovery()
+
+
+def wait_for_recovery():
+    """Block until MongoDB answers again, then log RTO and the true RPO."""
+    while True:
+        time.sleep(PROBE_INTERVAL)
+        try:
+            client.admin.command("ping")
+            seq, ts = durable_seq()
+            break
+        except pymongo.errors.PyMongoError as e:
+            logging.debug(f"Still unreachable: {e}")
+    monitor.recovered(sequence, seq, ts)
+
+
+def bulk_write_concern():
+    """Build the bulk-mode WriteConcern from MONGO_WRITE_W / _J / _WTIMEOUT_MS."""
+    w = int(WRITE_W) if WRITE_W.isdigit() else WRITE_W
+    j = WRITE_J.lower() in ("true", "1", "yes") if WRITE_J else None
+    return WriteConcern(w=w, j=j, wtimeout=WRITE_WTIMEOUT_MS or None)
+
+
+def insert_batch(coll, batch_size):
+    docs = [generate_random_data() for i in range(batch_size)]
+    start = time.monotonic()
+    attempt_at = datetime.utcnow()
+    try:
+        result = coll.insert_many(docs, ordered=False)
+        inserted = len(result.inserted_ids)
+        sequence.commit(docs[-1]["seq"], docs[-1]["ts"])
+        monitor.ok()
+    except pymongo.errors.ConnectionFailure as e:
+        inserted = 0
+        metrics.inc("errors_total", type=type(e).__name__)
+        monitor.failed(e, attempt_at)
+    except pymongo.errors.BulkWriteError as e:
+        inserted = e.details.get("nInserted", 0)
+        metrics.inc("errors_total", type=type(e).__name__)
+        logging.error(f"Bulk write partially failed: {inserted}/{batch_size} inserted, "
+                      f"{len(e.details.get('writeErrors', []))} write errors, "
+                      f"{len(e.details.get('writeConcernErrors', []))} write concern errors")
+    except pymongo.errors.PyMongoError as e:
+        inserted = 0
+        metrics.inc("errors_total", type=type(e).__name__)
+        logging.error(f"Bulk write failed: {e}")
+    latency = time.monotonic() - start
+    metrics.inc("records_written_total", inserted)
+    if inserted == batch_size:
+        metrics.inc("bytes_written_total", sum(len(doc["res"]) for doc in docs))
+    metrics.observe("write_latency_seconds", latency, op="insert_many")
+    return inserted, latency
+
+
+# Insert data in unordered insert_many batches with several batches in flight
+def insert_bulk_data(batch_size=BATCH_SIZE, inflight=INFLIGHT_BATCHES, round_sec=BULK_ROUND_SEC):
+    write_concern = bulk_write_concern()
+    coll = collection.with_options(write_concern=write_concern)
+    round_start = time.monotonic()
+
+    def worker():
+        acks = []
+        while time.monotonic() - round_start < round_sec and not monitor.in_outage:
+            inserted, latency = insert_batch(coll, batch_size)
+            log_pipeline.record("Batch acked: %d/%d docs in %.1f ms", inserted, batch_size, latency * 1000)
+            acks.append((inserted, latency))
+        return acks
+
+    with ThreadPoolExecutor(max_workers=inflight, thread_name_prefix="bulk") as pool:
+        acks = [ack for fut in [pool.submit(worker) for i in range(inflight)] for ack in fut.result()]
+    if monitor.in_outage:
+        sequence.rollback()
+        wait_for_recovery()
+    elapsed = time.monotonic() - round_start
+    if not acks:
+        # Round started mid-outage (or MONGO_BULK_ROUND_SEC=0): nothing was sent.
+        logging.info(f"Bulk round: no batches sent in {elapsed:.1f}s")
+        return
+    docs = sum(inserted for inserted, latency in acks)
+    latencies = sorted(latency for inserted, latency in acks)
+    logging.info(f"Bulk round: {docs} docs in {len(acks)} batches over {elapsed:.1f}s -> {docs / max(elapsed, 1e-6):.0f} docs/s "
+                 f"| ack latency avg={sum(latencies) / len(latencies) * 1000:.1f} ms "
+                 f"max={latencies[-1] * 1000:.1f} ms | {write_concern.document or 'default write concern'}")
+    logging.info('\n')
+
+
 # Read random data from MongoDB
 def read_random_data():
-    data_count = collection.count_documents({})
+    """Log a random sample of 10-30 documents (or one when the collection is small).
+
+    $sample is served from a random cursor for small samples, so neither the
+    document count nor the sample grows the writer's memory with the collection.
+    """
+    start = time.monotonic()
+    attempt_at = datetime.utcnow()
+    try:
+        docs, data_count = sample_documents()
+    except pymongo.errors.ConnectionFailure as e:
+        handle_outage(e, attempt_at)
+        return
+    elapsed = time.monotonic() - start
+    metrics.inc("records_read_total", len(docs))
+    metrics.observe("read_latency_seconds", elapsed, op="sample")
+    for random_doc in docs:
+        log_pipeline.record("Read data: %s", log_pipeline.Truncated(random_doc))
+    logging.info(f"Read {len(docs)} docs (~{data_count} in collection) in {elapsed * 1000:.1f} ms")
+    logging.info('\n')
+
+
+def sample_documents():
+    data_count = collection.estimated_document_count()
     index_value = None
     if data_count >= 30:
         index_value = random.randrange(10, 30, 3)
     if index_value:
-        data_db = list(collection.find())
-        random.shuffle(data_db)
-        for random_doc in data_db[:index_value]:
-            logging.info(f"Read data: {random_doc}")
+        docs = list(collection.aggregate([{"$sample": {"size": index_value}}]))
     else:
-        random_doc = collection.find_one()
-        logging.info(f"Read data: {random_doc}")
-    logging.info('\n')
+        docs = [collection.find_one()]
+    return docs, data_count
+
+
+async def run_async_engine(inserts=ASYNC_INSERTS, reads=ASYNC_READS, report_sec=ASYNC_REPORT_SEC):
+    """Drive MongoDB from one event loop with a fixed number of operations in flight.
+
+    Every insert and read slot is a coroutine that issues its next operation as
+    soon as the previous one is acknowledged, so a slowing server throttles the
+    writer (backpressure) instead of piling up requests. When an operation fails
+    with a connection error, one slot measures the outage and the rest park
+    until it has recovered.
+    """
+    from pymongo import AsyncMongoClient
+
+    aclient = AsyncMongoClient(MONGO_URI, serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS,
+                               maxPoolSize=inserts + reads + 1)
+    acoll = aclient[MONGO_COLLECTION_NAME][DB_NAME].with_options(write_concern=bulk_write_concern())
+    available = asyncio.Event()
+    available.set()
+    counts = {"insert": 0, "read": 0}
+
+    async def recover(error, since):
+        metrics.inc("errors_total", type=type(error).__name__)
+        if not available.is_set():
+            await available.wait()
+            return
+        available.clear()
+        monitor.failed(error, since)
+        while True:
+            await asyncio.sleep(PROBE_INTERVAL)
+            try:
+                await aclient.admin.command("ping")
+                doc = await acoll.find_one({"host": socket.gethostname()}, {"seq": 1, "ts": 1}, sort=[("seq", -1)])
+                break
+            except pymongo.errors.PyMongoError as e:
+                logging.debug(f"Still unreachable: {e}")
+        monitor.recovered(sequence, doc["seq"] if doc else 0, doc.get("ts") if doc else None)
+        available.set()
+
+    async def insert_slot():
+        while True:
+            await available.wait()
+            data = generate_random_data()
+            start = time.monotonic()
+            try:
+                await acoll.insert_one(data)
+            except pymongo.errors.ConnectionFailure as e:
+                await recover(e, data["ts"])
+                continue
+            except pymongo.errors.PyMongoError as e:
+                metrics.inc("errors_total", type=type(e).__name__)
+                logging.error(f"Insert failed: {e}")
+                continue
+            sequence.commit(data["seq"], data["ts"])
+            monitor.ok()
+            counts["insert"] += 1
+            metrics.inc("records_written_total")
+            metrics.inc("bytes_written_total", len(data["res"]))
+            metrics.observe("write_latency_seconds", time.monotonic() - start, op="insert_one")
+
+    async def read_slot():
+        while True:
+            await available.wait()
+            start = time.monotonic()
+            attempt_at = datetime.utcnow()
+            try:
+                cursor = await acoll.aggregate([{"$sample": {"size": random.randrange(10, 30, 3)}}])
+                docs = [doc async for doc in cursor]
+            except pymongo.errors.ConnectionFailure as e:
+                await recover(e, attempt_at)
+                continue
+            except pymongo.errors.PyMongoError as e:
+                metrics.inc("errors_total", type=type(e).__name__)
+                logging.error(f"Read failed: {e}")
+                continue
+            counts["read"] += 1
+            metrics.inc("records_read_total", len(docs))
+            metrics.observe("read_latency_seconds", time.monotonic() - start, op="sample")
+
+    async def reporter():
+        while True:
+            window_start = time.monotonic()
+            before = dict(counts)
+            await asyncio.sleep(report_sec)
+            elapsed = time.monotonic() - window_start
+            logging.info(f"Async engine: {(counts['insert'] - before['insert']) / elapsed:.0f} inserts/s, "
+                         f"{(counts['read'] - before['read']) / elapsed:.1f} reads/s "
+                         f"({inserts} insert + {reads} read slots{', paused for outage' if monitor.in_outage else ''})")
+
+    logging.info(f"Async engine: {inserts} inserts and {reads} reads in flight | "
+                 f"{bulk_write_concern().document or 'default write concern'}")
+    try:
+        await asyncio.gather(reporter(), *[insert_slot() for i in range(inserts)], *[read_slot() for i in range(reads)])
+    finally:
+        await aclient.close()
+
+
+def discover_members(members):
+    """Refresh members ({host: marker collection on a direct connection}) and return the current primary."""
+    hello = client.admin.command("hello")
+    hosts = hello.get("hosts", []) + hello.get("passives", [])
+    if not hosts:
+        members.setdefault("standalone", client[MONGO_COLLECTION_NAME][LAG_COLLECTION])
+        return None
+    for host in hosts:
+        if host not in members:
+            member = pymongo.MongoClient(f"mongodb://{DB_USER}:{DB_PASSWORD}@{host}/", directConnection=True,
+                                         serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS)
+            members[host] = member[MONGO_COLLECTION_NAME][LAG_COLLECTION]
+    for host in [h for h in members if h not in hosts]:
+        members.pop(host).database.client.close()
+    return hello.get("primary")
+
+
+def wait_visible(coll, marker, start, deadline, poll):
+    """Poll one member for marker; return seconds since start when it shows up, None past deadline."""
+    while True:
+        try:
+            if coll.find_one(marker, {"_id": 1}) is not None:
+                return time.monotonic() - start
+        except pymongo.errors.PyMongoError as e:
+            logging.debug(f"Lag probe read failed: {e}")
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(poll)
+
+
+def report_lag(samples, missed, primary, timeout):
+    for host in sorted(set(samples) | set(missed)):
+        lags = sorted(samples.get(host, []))
+        role = "primary" if host == primary else "standalone" if primary is None else "secondary"
+        summary = "no markers seen"
+        if lags:
+            pick = lambda p: lags[min(len(lags) - 1, int(len(lags) * p / 100))] * 1000
+            summary = (f"p50={pick(50):.1f} ms p95={pick(95):.1f} ms p99={pick(99):.1f} ms "
+                       f"max={lags[-1] * 1000:.1f} ms over {len(lags)} marker(s)")
+        if missed.get(host):
+            summary += f", {missed[host]} not visible within {timeout:g}s"
+        logging.info(f"Write-to-visible {host} ({role}): {summary}")
+
+
+def run_lag_probe(interval=LAG_PROBE_SEC, poll_ms=LAG_POLL_MS, timeout=LAG_TIMEOUT_SEC, report_sec=LAG_REPORT_SEC):
+    """Write a marker every interval seconds and time how long each replica set member takes to show it.
+
+    Every member is polled over its own direct connection, so the latency is
+    write-to-visible on that node: read-your-writes on the primary, replication
+    lag on the secondaries. A member still waiting for an older marker is not
+    given a new one, so one lagging secondary does not hold up the others. The
+    marker is a single upserted document per writer host, read by _id, so the
+    probe adds one tiny write per interval to the load it is measuring.
+    """
+    markers = client[MONGO_COLLECTION_NAME][LAG_COLLECTION]
+    host = socket.gethostname()
+    run = uuid.uuid4().hex
+    members, primary = {}, None
+    samples, missed, waiting = {}, {}, {}
+    n = 0
+    window_start = time.monotonic()
+    logging.info(f"Lag probe: one marker every {interval:.1f}s, polled every {poll_ms:.0f} ms on each member")
+    with ThreadPoolExecutor(max_workers=16, thread_name_prefix="lag") as pool:
+        while True:
+            for name, fut in [(name, fut) for name, fut in waiting.items() if fut.done()]:
+                del waiting[name]
+                lag = fut.result()
+                if lag is None:
+                    missed[name] = missed.get(name, 0) + 1
+                else:
+                    samples.setdefault(name, []).append(lag)
+                    metrics.observe("replication_lag_seconds", lag, member=name)
+            if not members or time.monotonic() - window_start >= report_sec:
+                report_lag(samples, missed, primary, timeout)
+                samples, missed = {}, {}
+                window_start = time.monotonic()
+                try:
+                    primary = discover_members(members)
+                except pymongo.errors.PyMongoError as e:
+                    logging.warning(f"Lag probe cannot list replica set members: {e}")
+                    time.sleep(interval)
+                    continue
+            n += 1
+            start = time.monotonic()
+            try:
+                markers.replace_one({"_id": host}, {"run": run, "n": n, "ts": datetime.utcnow()}, upsert=True)
+            except pymongo.errors.PyMongoError as e:
+                logging.debug(f"Lag probe marker write failed: {e}")
+                time.sleep(interval)
+                continue
+            marker = {"_id": host, "run": run, "n": {"$gte": n}}
+            for name, coll in members.items():
+                if name not in waiting:
+                    waiting[name] = pool.submit(wait_visible, coll, marker, start, start + timeout, poll_ms / 1000)
+            time.sleep(max(interval - (time.monotonic() - start), 0))
 
 
 if __name__ == "__main__":
@@ -96,8 +447,24 @@ if __name__ == "__main__":
     create_db()
     db = client[MONGO_COLLECTION_NAME]
     collection = db[DB_NAME]
+    collection.create_index([("host", 1), ("seq", -1)])
+    if not SEQ_FILE:
+        # No persisted sequence — carry on from this host's last document.
+        sequence.resume(durable_seq()[0])
+    logging.info(f"Writer sequence starts at {sequence.next}")
+    metrics.start_server()
+    probe = OutageProbe(lambda: client.admin.command("ping"), PROBE_INTERVAL, PROBE_FAILURES)
+    probe.watch(monitor, lambda: monitor.recovered(sequence, *durable_seq()))
+    probe.start()
+    if LAG_PROBE_SEC:
+        threading.Thread(target=run_lag_probe, name="lag-probe", daemon=True).start()
+    if ENGINE == "async":
+        asyncio.run(run_async_engine())
     while True:
-        insert_random_data()
+        if BATCH_SIZE:
+            insert_bulk_data()
+        else:
+            insert_random_data()
 
         # Read random data from MongoDB
         read_random_data()
@@ -1,27 +1,58 @@
 import time
 
 import mysql.connector
+import mysql.connector.pooling
 import os
 import logging
 import time
 
 
 import uuid
-import secrets
-import string
+import glob
 import socket
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from functools import wraps
-from faker import Faker
+import log_pipeline
+from record_pool import RecordPool
+from rpo_rto import WriteSequence, OutageMonitor, OutageProbe
+import metrics
 
-logging.basicConfig(format='%(asctime)s - %(threadName)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+log_pipeline.setup('%(asctime)s - %(threadName)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
 
 DB_USER = os.environ.get('MYSQL_DB_USER')
 DB_PASSWORD = os.environ.get('MYSQL_DB_PASSWORD')
 DB_HOST = os.environ.get('MYSQL_DB_HOST')
 DB_NAME = "mydatabase"
 DB_TABLE_NAME = "WORKLOAD"
-fake = Faker()
+# Write pacing: the defaults keep the original one-row-every-5s behaviour.
+BATCH_SIZE = int(os.environ.get('MYSQL_BATCH_SIZE', 1))
+COMMIT_EVERY_ROWS = int(os.environ.get('MYSQL_COMMIT_EVERY_ROWS', BATCH_SIZE))
+COMMIT_EVERY_MS = int(os.environ.get('MYSQL_COMMIT_EVERY_MS', 0))
+INSERT_SLEEP = float(os.environ.get('MYSQL_INSERT_SLEEP', 5))
+# Open-loop mode: rows/s on a fixed timeline (0 keeps the closed-loop insert_data).
+TARGET_RATE = float(os.environ.get('MYSQL_TARGET_RATE', 0))
+REPORT_SEC = float(os.environ.get('MYSQL_REPORT_SEC', 10))
+# MYSQL_MODE=verify walks WORKLOAD and checks the per-host sequence numbers instead of writing.
+MODE = os.environ.get('MYSQL_MODE', 'write')
+SEQ_FILE = os.environ.get('MYSQL_SEQ_FILE', '')
+VERIFY_PAGE_ROWS = int(os.environ.get('MYSQL_VERIFY_PAGE_ROWS', 50000))
+# Outage handling: how often a background SELECT 1 checks the server (PROBE_FAILURES misses in a row make an
+# outage), and how often to retry it once down.
+PROBE_INTERVAL = float(os.environ.get('MYSQL_PROBE_INTERVAL', 0.2))
+PROBE_FAILURES = int(os.environ.get('MYSQL_PROBE_FAILURES', 2))
+CONNECT_TIMEOUT = int(os.environ.get('MYSQL_CONNECT_TIMEOUT', 2))
+OUTAGE_ERRORS = (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)
+# Multi-worker mode: MYSQL_WORKERS sessions (pooled up to 32), optionally one WORKLOAD_<n> table each.
+WORKERS = int(os.environ.get('MYSQL_WORKERS', 1))
+SHARD_TABLES = os.environ.get('MYSQL_SHARD_TABLES', 'false').lower() in ('true', '1', 'yes')
+# Soak runs: MYSQL_PARTITION_HOURS > 0 creates new tables RANGE-partitioned on dt, and a maintainer
+# keeps MYSQL_PARTITIONS_AHEAD future partitions and drops those older than MYSQL_RETENTION_HOURS (0 keeps all).
+PARTITION_HOURS = int(os.environ.get('MYSQL_PARTITION_HOURS', 0))
+PARTITIONS_AHEAD = int(os.environ.get('MYSQL_PARTITIONS_AHEAD', 3))
+RETENTION_HOURS = int(os.environ.get('MYSQL_RETENTION_HOURS', 0))
+PARTITION_CHECK_SEC = float(os.environ.get('MYSQL_PARTITION_CHECK_SEC', 300))
+records = RecordPool()
 
 
 def retry(ExceptionToCheck, tries=4, delay=3, backoff=2, logger=None):
@@ -90,10 +121,17 @@ def drop_table():
     mycursor.execute(sql)
 
 
-def create_table():
-    sql = f"""CREATE TABLE {DB_TABLE_NAME}(
-       srno int NOT NULL AUTO_INCREMENT PRIMARY KEY,
-       dt DATETIME,
+def create_table(table_name=DB_TABLE_NAME):
+    # A partitioned table needs dt in every unique key, so the primary key becomes (srno, dt).
+    # srno is bigint: dropping partitions never resets AUTO_INCREMENT, and at 5000 rows/s an int lasts ~5 days.
+    if PARTITION_HOURS:
+        key, dt, partitions = "PRIMARY KEY (srno, dt),", "dt DATETIME(6) NOT NULL", partition_clause(
+            partition_bounds(datetime.now(), PARTITIONS_AHEAD + 1))
+    else:
+        key, dt, partitions = "", "dt DATETIME(6)", ""
+    sql = f"""CREATE TABLE {table_name}(
+       srno bigint NOT NULL AUTO_INCREMENT{'' if PARTITION_HOURS else ' PRIMARY KEY'},
+       {dt},
        DATA LONGTEXT, 
        host varchar(255),
        first_name varchar(50) COLLATE utf8_unicode_ci NOT NULL,
@@ -104,12 +142,231 @@ def create_table():
        country varchar(100) COLLATE utf8_unicode_ci NOT NULL,
        birthdate date NOT NULL,
        latitude varchar(100) COLLATE utf8_unicode_ci NOT NULL,
-       longitude varchar(100) COLLATE utf8_unicode_ci NOT NULL
-    )ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci; """
+       longitude varchar(100) COLLATE utf8_unicode_ci NOT NULL,
+       seq bigint NOT NULL DEFAULT 0,
+       {key}
+       KEY host_seq (host, seq)
+    )ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci {partitions}; """
 
     mycursor.execute(sql)
 
 
+def partition_bounds(now, count):
+    """Upper bounds of count consecutive PARTITION_HOURS-wide partitions, starting with the one holding now."""
+    width = timedelta(hours=PARTITION_HOURS)
+    epoch = datetime(1970, 1, 1)
+    start = epoch + (now - epoch) // width * width
+    return [start + width * (i + 1) for i in range(count)]
+
+
+def partition_name(bound):
+    return f"p{bound:%Y%m%d%H}"
+
+
+def partition_defs(bounds):
+    parts = [f"PARTITION {partition_name(b)} VALUES LESS THAN ('{b:%Y-%m-%d %H:%M:%S}')" for b in bounds]
+    return f"({', '.join(parts)}, PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+
+
+def partition_clause(bounds):
+    return f"PARTITION BY RANGE COLUMNS (dt) {partition_defs(bounds)}"
+
+
+def maintain_partitions(cursor, table_name):
+    """Add the next PARTITIONS_AHEAD partitions and drop the ones past the retention window.
+
+    New partitions are split off the empty pmax catch-all, and old ones are dropped
+    whole, so neither step copies rows or holds long locks the writers would notice.
+    """
+    cursor.execute("SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS, DATA_LENGTH + INDEX_LENGTH "
+                   "FROM information_schema.PARTITIONS WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s "
+                   "AND PARTITION_NAME IS NOT NULL", (DB_NAME, table_name))
+    rows = cursor.fetchall()
+    if not rows:
+        logging.warning(f"{table_name} is not partitioned; drop it (or point MYSQL_PARTITION_HOURS at a new "
+                        f"table) to enable retention pruning")
+        return
+    bounds = {name: datetime.strptime(desc.strip("'"), "%Y-%m-%d %H:%M:%S")
+              for name, desc, _, _ in rows if desc != "MAXVALUE"}
+    now = datetime.now()
+
+    highest = max(bounds.values(), default=datetime.min)
+    new = [b for b in partition_bounds(now, PARTITIONS_AHEAD + 1) if b > highest]
+    if new:
+        cursor.execute(f"ALTER TABLE {table_name} REORGANIZE PARTITION pmax INTO {partition_defs(new)}")
+        logging.info(f"{table_name}: added partitions {', '.join(partition_name(b) for b in new)}")
+
+    if RETENTION_HOURS:
+        cutoff = now - timedelta(hours=RETENTION_HOURS)
+        expired = sorted(name for name, bound in bounds.items() if bound <= cutoff)
+        if expired:
+            dropped_rows = sum(r[2] or 0 for r in rows if r[0] in expired)
+            cursor.execute(f"ALTER TABLE {table_name} DROP PARTITION {', '.join(expired)}")
+            metrics.inc("partitions_dropped_total", len(expired), table=table_name)
+            logging.info(f"{table_name}: dropped {len(expired)} partition(s) older than {cutoff:%Y-%m-%d %H:%M} "
+                         f"(~{dropped_rows} rows): {', '.join(expired)}")
+            rows = [r for r in rows if r[0] not in expired]
+    metrics.gauge("table_bytes", sum(r[3] or 0 for r in rows), table=table_name)
+
+
+def partition_maintainer(tables, interval=PARTITION_CHECK_SEC):
+    """Run maintain_partitions on every table now and then every interval seconds, on its own connection."""
+    conn = None
+    while True:
+        try:
+            if conn is None:
+                conn = connect_db()
+            cursor = conn.cursor()
+            for table_name in tables:
+                maintain_partitions(cursor, table_name)
+            cursor.close()
+        except Exception as e:
+            # Anything, including unexpected partition metadata, must not silently end the maintainer.
+            logging.warning(f"Partition maintenance failed, retrying in {interval:.0f}s: {e!r}")
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            conn = None
+        time.sleep(interval)
+
+
+def start_partition_maintainer(tables):
+    if PARTITION_HOURS:
+        threading.Thread(target=partition_maintainer, args=(tables,), name="partitions", daemon=True).start()
+
+
+def add_seq_column(table_name=DB_TABLE_NAME):
+    """Add the seq column and index to a WORKLOAD table created before they existed."""
+    mycursor.execute(f"SHOW COLUMNS FROM {table_name} LIKE 'seq'")
+    if not mycursor.fetchall():
+        logging.info(f"Adding seq column to existing table {table_name}")
+        mycursor.execute(f"ALTER TABLE {table_name} MODIFY dt DATETIME(6), "
+                         f"ADD COLUMN seq bigint NOT NULL DEFAULT 0, ADD KEY host_seq (host, seq)")
+
+
+def connect_db():
+    return mysql.connector.connect(
+        host=DB_HOST,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME,
+        connection_timeout=CONNECT_TIMEOUT
+    )
+
+
+class TableWriter:
+    """One MySQL session writing sequence-stamped rows into one table.
+
+    connect is a zero-arg callable returning a new connection (a plain connect
+    or pool.get_connection), so every worker reconnects on its own after a
+    failover instead of sharing one dead cursor.
+    """
+
+    def __init__(self, name, table_name, host_name, seq_file, connect):
+        self.name = name
+        self.table_name = table_name
+        self.host_name = host_name
+        self.connect_fn = connect
+        self.sequence = WriteSequence(seq_file, host_name)
+        self.monitor = OutageMonitor(name)
+        self.insert_sql = f"INSERT INTO {table_name} (dt, DATA, host, first_name, last_name, email, zipcode, city, country, birthdate, latitude, longitude, seq) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+        self.conn = self.cursor = None
+        self.connected_at = None
+
+    def connect(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except mysql.connector.Error:
+                pass
+        self.conn = self.connect_fn()
+        self.cursor = self.conn.cursor()
+        self.connected_at = datetime.utcnow()
+
+    def durable_seq(self, cursor=None):
+        """Return (seq, dt) of this writer's newest row the database still holds."""
+        cursor = cursor or self.cursor
+        cursor.execute(f"SELECT seq, dt FROM {self.table_name} WHERE host = %s ORDER BY seq DESC LIMIT 1",
+                       (self.host_name,))
+        row = cursor.fetchone()
+        return row if row else (0, None)
+
+    def probe_recovered(self):
+        """OutageProbe callback: measure RPO on a fresh connection while this writer may still be asleep."""
+        conn = connect_db()
+        try:
+            seq, dt = self.durable_seq(conn.cursor())
+        finally:
+            conn.close()
+        self.monitor.recovered(self.sequence, seq, dt)
+
+    def generate_row(self):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+        r = records.record()
+        return (now, r["res"], self.host_name, r["first_name"], r["last_name"], r["email"], r["zipcode"], r["city"],
+                r["country"], r["birthdate"], r["latitude"], r["longitude"], self.sequence.take())
+
+    def commit(self, rows):
+        self.conn.commit()
+        self.sequence.commit(rows[-1][-1], rows[-1][0])
+        self.monitor.ok()
+        metrics.inc("commits_total")
+
+    def handle_outage(self, error, since):
+        """Block until MySQL accepts connections again, then log RTO and the true RPO."""
+        self.sequence.rollback()
+        metrics.inc("errors_total", type=type(error).__name__)
+        if self.monitor.outage_end and self.connected_at < self.monitor.outage_end:
+            # The probe has already measured this outage; this session just predates it.
+            try:
+                self.connect()
+                return
+            except mysql.connector.Error:
+                pass
+        self.monitor.failed(error, since)
+        while True:
+            time.sleep(PROBE_INTERVAL)
+            try:
+                self.connect()
+                seq, dt = self.durable_seq()
+                break
+            except mysql.connector.Error as e:
+                logging.debug(f"Still unreachable: {e}")
+        self.monitor.recovered(self.sequence, seq, dt)
+
+
+_ping_conn = None
+
+
+def ping_db():
+    """SELECT 1 on a dedicated connection; raises while MySQL is unreachable."""
+    global _ping_conn
+    try:
+        if _ping_conn is None:
+            _ping_conn = connect_db()
+        cursor = _ping_conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+    except mysql.connector.Error:
+        if _ping_conn is not None:
+            try:
+                _ping_conn.close()
+            except mysql.connector.Error:
+                pass
+        _ping_conn = None
+        raise
+
+
+def start_outage_probe(writers):
+    probe = OutageProbe(ping_db, PROBE_INTERVAL, PROBE_FAILURES)
+    for writer in writers:
+        probe.watch(writer.monitor, writer.probe_recovered)
+    probe.start()
+
+
 def desc_table():
     sql = f"Desc {DB_TABLE_NAME}"
 
@@ -118,23 +375,180 @@ def desc_table():
     print(result)
 
 
-def insert_data(sleep=5):
+def insert_data(writer, sleep=INSERT_SLEEP, batch_size=BATCH_SIZE, commit_rows=COMMIT_EVERY_ROWS, commit_ms=COMMIT_EVERY_MS):
+    """Insert generated rows in batches of batch_size via executemany.
+
+    mysql-connector rewrites executemany on an INSERT into a single multi-row
+    VALUES statement. A commit is issued once commit_rows rows are pending or
+    commit_ms milliseconds have passed since the last one, whichever comes first.
+    """
+    uncommitted = 0
+    last_commit = time.monotonic()
     while True:
         try:
-            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-            sql = f"INSERT INTO {DB_TABLE_NAME} (dt, DATA, host, first_name, last_name, email, zipcode, city, country, birthdate, latitude, longitude) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-            res = ''.join(secrets.choice(string.ascii_uppercase + string.digits)
-                          for i in range(10))
-            host_name = socket.gethostname()
-            row = [fake.first_name(), fake.last_name(), fake.email(), \
-               fake.postcode(), fake.city(), fake.country(), fake.date_of_birth(), str(fake.latitude()), str(fake.longitude())]
-            val = (now, res, host_name,row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7],row[8] )
-            logging.info(f"Data Written {now} {res} {host_name} {row[1]}, {row[2]}, {row[3]}, {row[4]}, {row[5]}, {row[6]}, {row[7]}, {row[8]}")
-            mycursor.execute(sql, val)
-            mydb.commit()
+            rows = [writer.generate_row() for i in range(batch_size)]
+            start = time.monotonic()
+            attempt_at = datetime.utcnow()
+            writer.cursor.executemany(writer.insert_sql, rows)
+            uncommitted += len(rows)
+            if uncommitted >= commit_rows or (commit_ms and (time.monotonic() - last_commit) * 1000 >= commit_ms):
+                writer.commit(rows)
+                uncommitted = 0
+                last_commit = time.monotonic()
+            elapsed = time.monotonic() - start
+            metrics.inc("records_written_total", len(rows))
+            metrics.inc("bytes_written_total", sum(len(row[1]) for row in rows))
+            metrics.observe("write_latency_seconds", elapsed, op="insert")
+            if batch_size == 1:
+                val = rows[0]
+                log_pipeline.record("Data Written %s %s %s %s, %s, %s, %s, %s, %s, %s, %s seq=%s",
+                                    val[0], log_pipeline.Truncated(val[1]), val[2], *val[4:])
+            else:
+                log_pipeline.record("Batch Written %d rows (%s .. %s) in %.1f ms -> %.0f rows/s, %d uncommitted",
+                                    len(rows), rows[0][0], rows[-1][0], elapsed * 1000, len(rows) / max(elapsed, 1e-6),
+                                    uncommitted)
             time.sleep(sleep)
-        except mysql.connector.errors.OperationalError as e:
-            logging.error(e)
+        except OUTAGE_ERRORS as e:
+            if uncommitted:
+                logging.error(f"{uncommitted} uncommitted rows lost")
+            uncommitted = 0
+            writer.handle_outage(e, attempt_at)
+
+
+class LatencyHistogram:
+    """HDR-style log-linear latency histogram (microsecond resolution, <1% bucket error)."""
+
+    SIGNIFICANT_BITS = 7
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    def record(self, seconds, count=1):
+        us = max(int(seconds * 1e6), 1)
+        shift = max(us.bit_length() - self.SIGNIFICANT_BITS, 0)
+        bucket = (us >> shift) << shift
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += count
+        self.max = max(self.max, us)
+
+    def percentile(self, p):
+        target = self.total * p / 100
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return bucket
+        return self.max
+
+
+def insert_at_rate(writer, rate=TARGET_RATE, batch_size=BATCH_SIZE, commit_rows=COMMIT_EVERY_ROWS, commit_ms=COMMIT_EVERY_MS,
+                   report_sec=REPORT_SEC):
+    """Insert rows open-loop at rate rows/s and report latency percentiles.
+
+    Batches are released from a fixed timeline (a token bucket refilled at rate),
+    not after the previous insert returns. Latency is measured from each batch's
+    intended start, so time spent queued behind a slow commit is counted rather
+    than hidden (coordinated omission).
+    """
+    interval = batch_size / rate
+    uncommitted = 0
+    next_start = last_commit = window_start = time.monotonic()
+    hist = LatencyHistogram()
+    rows_done = errors = 0
+    logging.info(f"Open-loop writer {writer.name}: {rate:.0f} rows/s in batches of {batch_size}")
+    while True:
+        rows = [writer.generate_row() for i in range(batch_size)]
+        now = time.monotonic()
+        if now < next_start:
+            time.sleep(next_start - now)
+        intended = next_start
+        next_start += interval
+        attempt_at = datetime.utcnow()
+        try:
+            writer.cursor.executemany(writer.insert_sql, rows)
+            uncommitted += len(rows)
+            if uncommitted >= commit_rows or (commit_ms and (time.monotonic() - last_commit) * 1000 >= commit_ms):
+                writer.commit(rows)
+                uncommitted = 0
+                last_commit = time.monotonic()
+            latency = time.monotonic() - intended
+            hist.record(latency, len(rows))
+            metrics.inc("records_written_total", len(rows))
+            metrics.inc("bytes_written_total", sum(len(row[1]) for row in rows))
+            metrics.observe("write_latency_seconds", latency, op="insert")
+            rows_done += len(rows)
+        except OUTAGE_ERRORS as e:
+            if uncommitted:
+                logging.error(f"{uncommitted} uncommitted rows lost")
+            uncommitted = 0
+            errors += 1
+            writer.handle_outage(e, attempt_at)
+
+        now = time.monotonic()
+        if now - window_start >= report_sec:
+            if hist.total:
+                logging.info(f"Latency p50={hist.percentile(50) / 1000:.1f} ms p95={hist.percentile(95) / 1000:.1f} ms "
+                             f"p99={hist.percentile(99) / 1000:.1f} ms max={hist.max / 1000:.1f} ms | "
+                             f"target {rate:.0f} rows/s, achieved {rows_done / (now - window_start):.0f} rows/s, "
+                             f"{errors} errors, {max(now - next_start, 0):.2f}s behind schedule")
+            else:
+                logging.info(f"No rows written in the last {now - window_start:.0f}s ({errors} errors)")
+            hist = LatencyHistogram()
+            rows_done = errors = 0
+            window_start = now
+
+
+def run_workers(workers=WORKERS, shard_tables=SHARD_TABLES):
+    """Run one TableWriter per worker thread, all drawing connections from one pool.
+
+    mysql-connector caps a pool at CNX_POOL_MAXSIZE (32) connections; above that
+    each worker opens its own session with connect_db instead.
+    """
+    if workers <= mysql.connector.pooling.CNX_POOL_MAXSIZE:
+        pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_name="workload",
+            pool_size=workers,
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            database=DB_NAME,
+            connection_timeout=CONNECT_TIMEOUT
+        )
+        connect_fn = pool.get_connection
+    else:
+        logging.info(f"{workers} workers exceed the connection pool limit of "
+                     f"{mysql.connector.pooling.CNX_POOL_MAXSIZE} — using one direct connection per worker")
+        connect_fn = connect_db
+    host_name = socket.gethostname()
+    threads, writers = [], []
+    for n in range(workers):
+        table_name = f"{DB_TABLE_NAME}_{n}" if shard_tables else DB_TABLE_NAME
+        if shard_tables:
+            try:
+                create_table(table_name)
+            except mysql.connector.errors.ProgrammingError:
+                add_seq_column(table_name)
+        # Each worker has its own host label and sequence, so the verifier sees n monotonic series.
+        writer = TableWriter(f"MySQL worker {n}", table_name, f"{host_name}-w{n}",
+                             f"{SEQ_FILE}.{n}" if SEQ_FILE else "", connect_fn)
+        writer.connect()
+        writers.append(writer)
+        if not SEQ_FILE:
+            writer.sequence.resume(writer.durable_seq()[0])
+        if TARGET_RATE:
+            target, kwargs = insert_at_rate, {"rate": TARGET_RATE / workers}
+        else:
+            target, kwargs = insert_data, {}
+        threads.append(threading.Thread(target=target, args=(writer,), kwargs=kwargs, name=f"worker-{n}", daemon=True))
+    start_partition_maintainer([f"{DB_TABLE_NAME}_{n}" for n in range(workers)] if shard_tables else [DB_TABLE_NAME])
+    start_outage_probe(writers)
+    logging.info(f"Starting {workers} workers on {'sharded tables' if shard_tables else DB_TABLE_NAME}")
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
 
 
 def create_user():
@@ -152,6 +566,93 @@ def grant_privilage():
     mydb.commit()
 
 
+def recorded_sequences():
+    """Map host label -> (seq, dt) for every MYSQL_SEQ_FILE[.<n>] on the volume.
+
+    The label is read from the file, so a verifier pod with another hostname (after
+    a rollout, or on the DR side) still matches rows to their writer's file. Files
+    written before the label was recorded are taken to belong to this pod.
+    """
+    if not SEQ_FILE:
+        return {}
+    recorded = {}
+    for path in [SEQ_FILE] + sorted(glob.glob(f"{glob.escape(SEQ_FILE)}.*")):
+        suffix = path[len(SEQ_FILE) + 1:]
+        if not os.path.isfile(path) or suffix == "tmp" or suffix.endswith(".tmp"):
+            continue
+        host = WriteSequence.load_host(path) or (f"{socket.gethostname()}-w{suffix}" if suffix
+                                                 else socket.gethostname())
+        recorded[host] = WriteSequence.load(path)
+    return recorded
+
+
+def verify_table(table_name=DB_TABLE_NAME, recorded=None, page_rows=VERIFY_PAGE_ROWS, max_gaps=20):
+    """Walk a WORKLOAD table in srno order and check every writer's sequence numbers.
+
+    Rows are read with keyset pagination on srno through an unbuffered cursor, so
+    memory stays constant however large the table is. For each host, a jump in
+    seq is a run of missing rows (reported with the dt on either side, i.e. the
+    data-loss window) and a repeated or backwards seq is a duplicate. If a
+    writer's MYSQL_SEQ_FILE is in recorded, committed rows missing at the tail are
+    reported too. Returns the hosts seen and the number of missing or duplicated rows.
+    """
+    recorded = recorded or {}
+    cursor = mydb.cursor()
+    hosts = {}
+    last_srno = scanned = legacy = 0
+    start = time.monotonic()
+    while True:
+        cursor.execute(f"SELECT srno, host, seq, dt FROM {table_name} WHERE srno > %s ORDER BY srno LIMIT %s",
+                       (last_srno, page_rows))
+        page = 0
+        for srno, host, seq, dt in cursor:
+            page += 1
+            last_srno = srno
+            if not seq:
+                legacy += 1
+                continue
+            h = hosts.get(host)
+            if h is None:
+                h = hosts[host] = {"rows": 0, "first": seq, "next": seq, "last_dt": None,
+                                   "missing": 0, "duplicates": 0, "gaps": []}
+            h["rows"] += 1
+            if seq > h["next"]:
+                h["missing"] += seq - h["next"]
+                if len(h["gaps"]) < max_gaps:
+                    h["gaps"].append((h["next"], seq - 1, h["last_dt"], dt))
+            elif seq < h["next"]:
+                h["duplicates"] += 1
+                continue
+            h["next"] = seq + 1
+            h["last_dt"] = dt
+        if not page:
+            break
+        scanned += page
+        elapsed = time.monotonic() - start
+        logging.info(f"{table_name}: verified {scanned} rows up to srno {last_srno} ({scanned / max(elapsed, 1e-6):.0f} rows/s)")
+        if page < page_rows:
+            break
+    cursor.close()
+
+    if legacy:
+        logging.info(f"{legacy} rows without a sequence number skipped")
+    problems = 0
+    for host, h in sorted(hosts.items()):
+        recorded_seq, recorded_dt = recorded.get(host, (0, None))
+        problems += h["missing"] + h["duplicates"]
+        logging.info(f"Host {host}: {h['rows']} rows, seq {h['first']}..{h['next'] - 1}, "
+                     f"{h['missing']} missing, {h['duplicates']} duplicated")
+        for first, last, before, after in h["gaps"]:
+            logging.warning(f"Host {host}: missing seq {first}..{last} ({last - first + 1} rows), "
+                            f"data-loss window {before} .. {after}")
+        if recorded_seq >= h["next"]:
+            problems += recorded_seq - h["next"] + 1
+            logging.warning(f"Host {host}: {recorded_seq - h['next'] + 1} committed rows lost at the tail "
+                            f"(seq {h['next']}..{recorded_seq}), data-loss window {h['last_dt']} .. {recorded_dt}")
+    logging.info(f"Verification of {table_name} finished: {scanned} rows in {time.monotonic() - start:.1f}s")
+    return set(hosts), problems
+
+
 def show_data():
     sql = f"SELECT * FROM {DB_TABLE_NAME}"
     mycursor.execute(sql)
@@ -162,23 +663,49 @@ def show_data():
 
 if __name__ == "__main__":
 
+    if MODE == "verify":
+        # Read-only: no database, table or column is created or altered after a failover.
+        mydb = connect_db()
+        mycursor = mydb.cursor()
+        mycursor.execute(f"SHOW TABLES LIKE '{DB_TABLE_NAME}'")
+        tables = [row[0] for row in mycursor.fetchall()]
+        mycursor.execute(f"SHOW TABLES LIKE '{DB_TABLE_NAME}\\_%'")
+        tables += sorted(row[0] for row in mycursor.fetchall())
+        if not tables:
+            logging.warning(f"No {DB_TABLE_NAME} tables in {DB_NAME} — nothing to verify")
+        recorded = recorded_sequences()
+        seen, problems = set(), 0
+        for table_name in tables:
+            mycursor.execute(f"SHOW COLUMNS FROM {table_name} LIKE 'seq'")
+            if not mycursor.fetchall():
+                logging.warning(f"{table_name} has no seq column (written before sequence numbers) — skipped")
+                continue
+            hosts, table_problems = verify_table(table_name, recorded)
+            seen |= hosts
+            problems += table_problems
+        for host, (seq, dt) in sorted(recorded.items()):
+            if seq and host not in seen:
+                problems += seq
+                logging.warning(f"No rows from {host} left, but it committed up to seq {seq} ({dt})")
+        if problems:
+            logging.error(f"Verification failed: {problems} missing or duplicated row(s)")
+        raise SystemExit(1 if problems else 0)
+
     try:
         create_db()
     except mysql.connector.errors.DatabaseError as e:
         logging.info("Database already exists")
     # drop_table()
-    mydb = mysql.connector.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
+    mydb = connect_db()
     mycursor = mydb.cursor()
 
     try:
         create_table()
     except mysql.connector.errors.ProgrammingError as e:
         logging.error("Table already exists")
+        add_seq_column()
+
+    metrics.start_server()
 
     try:
         create_user()
@@ -189,5 +716,19 @@ if __name__ == "__main__":
 
     # desc_table()
     logging.info("Writting Data")
-    insert_data()
+    if WORKERS > 1:
+        run_workers()
+    else:
+        start_partition_maintainer([DB_TABLE_NAME])
+        writer = TableWriter("MySQL", DB_TABLE_NAME, socket.gethostname(), SEQ_FILE, connect_db)
+        writer.connect()
+        if not SEQ_FILE:
+            # No persisted sequence — carry on from this host's last row in the table.
+            writer.sequence.resume(writer.durable_seq()[0])
+        logging.info(f"Writer sequence starts at {writer.sequence.next}")
+        start_outage_probe([writer])
+        if TARGET_RATE:
+            insert_at_rate(writer)
+        else:
+            insert_data(writer)
     # show_data()
@@ -0,0 +1,100 @@
+import os
+import time
+import queue
+import atexit
+import random
+import logging
+import itertools
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+# LOG_ASYNC moves formatting and stream writes to a background thread.
+LOG_ASYNC = os.environ.get("LOG_ASYNC", "false").lower() in ("true", "1", "yes")
+# Per-record lines (record()) are logged every LOG_SAMPLE_EVERY-th call, and then only with probability LOG_SAMPLE_RATE.
+LOG_SAMPLE_EVERY = max(int(os.environ.get("LOG_SAMPLE_EVERY", 1)), 1)
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", 1.0))
+LOG_SUMMARY_SEC = float(os.environ.get("LOG_SUMMARY_SEC", 60))
+LOG_MAX_CHARS = int(os.environ.get("LOG_MAX_CHARS", 1000))
+
+_seen = itertools.count(1)
+_logged = itertools.count(1)
+_counts = {"seen": 0, "logged": 0}
+
+
+class UTCISOFormatter(logging.Formatter):
+    """Render %(asctime)s as a UTC ISO-8601 timestamp, e.g. 2024-05-01T12:00:00.123456."""
+
+    def formatTime(self, record, datefmt=None):
+        return datetime.utcfromtimestamp(record.created).isoformat()
+
+
+class Truncated:
+    """Log argument that is cut to LOG_MAX_CHARS, and only when actually formatted."""
+
+    def __init__(self, value, limit=LOG_MAX_CHARS):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        text = str(self.value)
+        if self.limit and len(text) > self.limit:
+            return f"{text[:self.limit]}… ({len(text)} chars)"
+        return text
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue the record as-is; the listener thread does all of the formatting."""
+
+    def prepare(self, record):
+        return record
+
+
+def setup(fmt, level=logging.INFO, stream=None, formatter=logging.Formatter):
+    """Configure the root logger, like logging.basicConfig(format=fmt, level=level, stream=stream).
+
+    With LOG_ASYNC the caller only pays for putting the record on a queue. When
+    per-record sampling is enabled, a summary line of seen vs. logged records
+    is written every LOG_SUMMARY_SEC.
+    """
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(formatter(fmt))
+    root = logging.getLogger()
+    root.setLevel(level)
+    if LOG_ASYNC:
+        q = queue.SimpleQueue()
+        listener = QueueListener(q, handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        root.addHandler(_DeferredQueueHandler(q))
+    else:
+        root.addHandler(handler)
+    if sampling() and LOG_SUMMARY_SEC > 0:
+        threading.Thread(target=_summarise, name="log-summary", daemon=True).start()
+
+
+def sampling():
+    return LOG_SAMPLE_EVERY > 1 or LOG_SAMPLE_RATE < 1
+
+
+def record(msg, *args):
+    """Log a per-record INFO line, subject to sampling.
+
+    Pass %-style args rather than an f-string: a line that is sampled out is
+    never formatted. Errors and outage events should use logging directly so
+    they are always kept.
+    """
+    _counts["seen"] = n = next(_seen)
+    if n % LOG_SAMPLE_EVERY == 0 and (LOG_SAMPLE_RATE >= 1 or random.random() < LOG_SAMPLE_RATE):
+        _counts["logged"] = next(_logged)
+        logging.info(msg, *args)
+
+
+def _summarise():
+    last_seen = last_logged = 0
+    while True:
+        time.sleep(LOG_SUMMARY_SEC)
+        seen, logged = _counts["seen"], _counts["logged"]
+        logging.info("Log summary: %d per-record events in the last %.0fs, %d logged, %d sampled out",
+                     seen - last_seen, LOG_SUMMARY_SEC, logged - last_logged, (seen - last_seen) - (logged - last_logged))
+        last_seen, last_logged = seen, logged
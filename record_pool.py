@@ -0,0 +1,114 @@
+import os
+import base64
+import random
+import string
+import logging
+import time
+from datetime import date, timedelta
+
+RECORD_POOL_SIZE = int(os.environ.get('RECORD_POOL_SIZE', 5000))
+RECORD_SEED = os.environ.get('RECORD_SEED')
+RES_ALPHABET = string.ascii_uppercase + string.digits
+# Payload profile for the res / DATA field. PAYLOAD_SIZE is a character count ("4096")
+# or a uniform range ("1024-65536"); unset keeps the classic 10-character res.
+PAYLOAD_SIZE = os.environ.get('PAYLOAD_SIZE', '')
+PAYLOAD_ENTROPY = os.environ.get('PAYLOAD_ENTROPY', 'random')
+PAYLOAD_BUFFER_MB = int(os.environ.get('PAYLOAD_BUFFER_MB', 4))
+PAYLOAD_BLOCK = 4096
+
+
+def parse_size(spec):
+    """Parse "4096" or "1024-65536" into (min, max) characters."""
+    low, _, high = spec.partition('-')
+    return int(low), int(high or low)
+
+
+class RecordPool:
+    """Synthetic person records sampled from pre-generated Faker values.
+
+    Faker is imported and called only while the pool is built; after that each
+    field is an independent indexed pick from its pool, so records stay varied
+    while costing a handful of random() calls. Passing a seed (or RECORD_SEED)
+    makes both the pool and the sampling reproducible.
+    """
+
+    def __init__(self, size=RECORD_POOL_SIZE, seed=RECORD_SEED):
+        from faker import Faker
+
+        start = time.monotonic()
+        self.rng = random.Random(seed)
+        fake = Faker()
+        if seed is not None:
+            fake.seed_instance(seed)
+        self.first_names = [fake.first_name() for i in range(size)]
+        self.last_names = [fake.last_name() for i in range(size)]
+        self.emails = [fake.email() for i in range(size)]
+        self.zipcodes = [fake.postcode() for i in range(size)]
+        self.cities = [fake.city() for i in range(size)]
+        self.countries = [fake.country() for i in range(size)]
+        self.addresses = [fake.address() for i in range(size)]
+        # Coordinates and birthdates need no locale data; draw them straight from the rng.
+        self.latitudes = [f"{self.rng.uniform(-90, 90):.6f}" for i in range(size)]
+        self.longitudes = [f"{self.rng.uniform(-180, 180):.6f}" for i in range(size)]
+        today = date.today()
+        self.birthdates = [today - timedelta(days=self.rng.randint(0, 115 * 365)) for i in range(size)]
+        self.payload_size = parse_size(PAYLOAD_SIZE) if PAYLOAD_SIZE else None
+        if self.payload_size:
+            self.payload_buffer = self.build_payload_buffer(PAYLOAD_ENTROPY, self.payload_size[1])
+        logging.info(f"Record pool of {size} values per field built in {time.monotonic() - start:.1f}s")
+
+    def build_payload_buffer(self, entropy, max_size):
+        """Pre-generate the text that payloads are sliced from.
+
+        random     base64 of random bytes (~6 bits per character, incompressible)
+        text       pooled names, cities and addresses joined into prose-like text
+        zeros      a single repeated character
+        dupblocks  one random PAYLOAD_BLOCK-character block repeated (dedup/compression friendly)
+        """
+        length = max(PAYLOAD_BUFFER_MB * 1024 * 1024, 2 * max_size)
+        if entropy == 'random':
+            buf = base64.b64encode(self.rng.randbytes(length * 3 // 4 + 3)).decode()
+        elif entropy == 'text':
+            words = self.first_names + self.last_names + self.cities + self.countries + self.addresses
+            parts, total = [], 0
+            while total < length:
+                part = ' '.join(self.rng.choices(words, k=64)) + '. '
+                parts.append(part)
+                total += len(part)
+            buf = ''.join(parts)
+        elif entropy == 'zeros':
+            buf = '0' * length
+        elif entropy == 'dupblocks':
+            block = base64.b64encode(self.rng.randbytes(PAYLOAD_BLOCK * 3 // 4)).decode()
+            buf = block * (length // len(block) + 1)
+        else:
+            raise ValueError(f"Unknown PAYLOAD_ENTROPY {entropy!r} (random, text, zeros, dupblocks)")
+        return buf[:length]
+
+    def payload(self):
+        """Return a payload of the configured size, sliced from the pre-generated buffer."""
+        if not self.payload_size:
+            return self.res()
+        size = self.rng.randint(*self.payload_size)
+        offset = self.rng.randrange(len(self.payload_buffer) - size + 1)
+        return self.payload_buffer[offset:offset + size]
+
+    def res(self, k=10):
+        return ''.join(self.rng.choices(RES_ALPHABET, k=k))
+
+    def record(self):
+        """Return one record as a dict of field name to sampled value."""
+        choice = self.rng.choice
+        return {
+            "res": self.payload(),
+            "first_name": choice(self.first_names),
+            "last_name": choice(self.last_names),
+            "email": choice(self.emails),
+            "zipcode": choice(self.zipcodes),
+            "city": choice(self.cities),
+            "country": choice(self.countries),
+            "address": choice(self.addresses),
+            "birthdate": choice(self.birthdates),
+            "latitude": choice(self.latitudes),
+            "longitude": choice(self.longitudes),
+        }
@@ -0,0 +1,170 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+
+import metrics
+
+
+class WriteSequence:
+    """Monotonic per-writer sequence number stamped on every record.
+
+    The highest acknowledged sequence and its timestamp are written to path after
+    every commit, followed by the host label the records carry. Kept on a volume
+    that outlives the database, it tells the verifier (whatever pod it runs in)
+    and the RPO measurement which acknowledged records a failover lost.
+    """
+
+    def __init__(self, path="", host=""):
+        self.path = path
+        self.host = host
+        self.committed, self.committed_dt = self.load(path)
+        self.next = self.committed + 1
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def load(path):
+        if path and os.path.exists(path):
+            with open(path) as fh:
+                seq, _, dt = fh.readline().strip().partition(' ')
+                return int(seq), dt or None
+        return 0, None
+
+    @staticmethod
+    def load_host(path):
+        """The host label recorded in path ("" for files written before it was recorded)."""
+        if path and os.path.exists(path):
+            with open(path) as fh:
+                fh.readline()
+                return fh.readline().strip()
+        return ""
+
+    def resume(self, seq):
+        """Continue numbering after seq (the writer's last record in the database)."""
+        self.committed = seq
+        self.next = seq + 1
+
+    def take(self):
+        with self.lock:
+            seq = self.next
+            self.next += 1
+            return seq
+
+    def commit(self, seq, dt):
+        with self.lock:
+            if seq <= self.committed:
+                return
+            self.committed, self.committed_dt = seq, dt
+            if self.path:
+                with open(f"{self.path}.tmp", "w") as fh:
+                    fh.write(f"{seq} {dt}\n{self.host}\n" if self.host else f"{seq} {dt}")
+                os.replace(f"{self.path}.tmp", self.path)
+
+    def rollback(self):
+        # Rows that were never committed were never acknowledged — reuse their numbers.
+        with self.lock:
+            self.next = self.committed + 1
+
+
+class OutageMonitor:
+    """Track one outage at a time and log [RPO-RTO] lines for it.
+
+    failed() takes the start time of the write that failed, so the outage start
+    is exact even when the client takes seconds to give up on a dead server;
+    a write sent before the last outage was closed belongs to that outage and
+    is ignored. recovered() compares the highest acknowledged sequence with the highest one
+    the database still holds: the difference is the true RPO in records.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.outage_start = None
+        self.outage_end = None
+        self.last_ok = None
+        self.lock = threading.Lock()
+
+    @property
+    def in_outage(self):
+        return self.outage_start is not None
+
+    def ok(self):
+        self.last_ok = datetime.utcnow()
+
+    def failed(self, error, since=None):
+        with self.lock:
+            if self.outage_start or (since and self.outage_end and since < self.outage_end):
+                return
+            self.outage_start = since or datetime.utcnow()
+        metrics.gauge("outage", 1, writer=self.name)
+        metrics.inc("outages_total", writer=self.name)
+        last_ok = self.last_ok.isoformat() if self.last_ok else "never"
+        logging.warning(f"[RPO-RTO] ⚠️ {self.name} UNREACHABLE from {self.outage_start.isoformat()} "
+                        f"(last successful write {last_ok}): {error}")
+
+    def recovered(self, sequence, durable_seq, durable_dt):
+        """Close the outage; a second caller (writer and probe both noticing) gets None."""
+        with self.lock:
+            if not self.outage_start:
+                return None
+            recovery_time = datetime.utcnow()
+            rto = (recovery_time - self.outage_start).total_seconds()
+            self.outage_start = None
+            self.outage_end = recovery_time
+        lost = max(sequence.committed - durable_seq, 0)
+        window = ""
+        if lost:
+            window = f" between {durable_dt} and {sequence.committed_dt}"
+        logging.info(f"[RPO-RTO] ✅ {self.name} RECOVERED at {recovery_time.isoformat()} | 🕓 RTO={rto:.3f}s | "
+                     f"💾 RPO={lost} acknowledged record(s) lost{window} | "
+                     f"last acked seq={sequence.committed}, last durable seq={durable_seq}")
+        metrics.gauge("outage", 0, writer=self.name)
+        metrics.gauge("rto_seconds", rto, writer=self.name)
+        metrics.gauge("rpo_records", lost, writer=self.name)
+        return rto, lost
+
+
+class OutageProbe:
+    """Ping the database every interval on a background thread.
+
+    Writers that sleep between writes would otherwise notice an outage only on
+    their next write, seconds late. After failures failed pings in a row the
+    probe calls failed() on every watched monitor with the send time of the
+    first of them, so one lost ping is not an outage; when the database
+    answers again it runs each monitor's recover callback (which measures RPO
+    and calls recovered()) unless the writer got there first.
+    """
+
+    def __init__(self, ping, interval, failures=2):
+        self.ping = ping
+        self.interval = interval
+        self.failures = max(1, failures)
+        self.targets = []
+
+    def watch(self, monitor, recover):
+        self.targets.append((monitor, recover))
+
+    def start(self):
+        threading.Thread(target=self.run, name="outage-probe", daemon=True).start()
+
+    def run(self):
+        streak, first_failed = 0, None
+        while True:
+            sent = datetime.utcnow()
+            try:
+                self.ping()
+                error = None
+                streak, first_failed = 0, None
+            except Exception as e:
+                error = e
+                streak, first_failed = streak + 1, first_failed or sent
+            for monitor, recover in self.targets:
+                if error is not None:
+                    if streak >= self.failures:
+                        monitor.failed(error, first_failed)
+                elif monitor.in_outage:
+                    try:
+                        recover()
+                    except Exception as e:
+                        logging.debug(f"Probe recovery check for {monitor.name} failed: {e}")
+            time.sleep(self.interval)